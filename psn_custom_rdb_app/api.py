@@ -1,4 +1,16 @@
 import frappe
+from frappe.utils import cint, flt, nowdate
+
+from psn_custom_rdb_app.psn_readiness_dashboard.access_scope import get_access_scope, get_task_conditions
+from psn_custom_rdb_app.psn_readiness_dashboard.dashboard_api.react_events_readiness import (
+    build_events_for_user,
+)
+from psn_custom_rdb_app.psn_readiness_dashboard.response_cache import cached_response
+
+# example: only allow Event Readiness users or System Manager
+FRONTEND_ROLES = {"Event Readiness User", "System Manager"}
+
+BOOTSTRAP_EVENTS_LIMIT = 20
 
 
 @frappe.whitelist()
@@ -18,14 +30,115 @@ def get_frontend_session_context():
     if user == "Guest":
         frappe.throw("Not logged in", frappe.AuthenticationError)
 
-    roles = frappe.get_roles(user)
-
-    # example: only allow Event Readiness users or System Manager
-    allowed_roles = {"Event Readiness User", "System Manager"}
-    has_access = bool(allowed_roles.intersection(set(roles)))
+    roles = get_access_scope(user).roles
 
     return {
         "user": user,
         "roles": roles,
-        "has_access": has_access,
+        "has_access": bool(FRONTEND_ROLES.intersection(roles)),
+    }
+
+
+@frappe.whitelist()
+def get_bootstrap(events_limit=BOOTSTRAP_EVENTS_LIMIT):
+    """
+    Everything the React client needs for first paint in one call:
+    session, roles, access scope, sectors, the first page of events
+    and headline counters. Served through the data-versioned response
+    cache, so repeat loads are a Redis read (or a 304).
+    """
+    if frappe.session.user == "Guest":
+        frappe.throw("Not logged in", frappe.AuthenticationError)
+
+    # active_events depends on the date, so a new day is a new cache key / ETag
+    return cached_response(
+        "get_bootstrap",
+        {"events_limit": events_limit, "today": nowdate()},
+        ("events", "tasks", "sectors"),
+        lambda: build_bootstrap(events_limit)
+    )
+
+
+def build_bootstrap(events_limit=BOOTSTRAP_EVENTS_LIMIT):
+    user = frappe.session.user
+    scope = get_access_scope(user)
+
+    # -------------------------
+    # 1️⃣ Session + scope (one cached lookup)
+    # -------------------------
+    session = {
+        "user": user,
+        "full_name": frappe.get_cached_value("User", user, "full_name"),
+        "roles": scope.roles,
+        "has_access": bool(FRONTEND_ROLES.intersection(scope.roles)),
+        "sector_list": scope.sectors,
+        "is_sector_lead": scope.is_lead,
+        "is_admin": scope.is_admin,
+    }
+
+    # -------------------------
+    # 2️⃣ First page of events
+    # -------------------------
+    events = build_events_for_user(limit=cint(events_limit) or BOOTSTRAP_EVENTS_LIMIT)
+
+    return {
+        "session": session,
+        "sectors": frappe.get_all("Sector", fields=["name"], order_by="name asc"),
+        "events": events["events"],
+        "events_total_count": events["total_count"],
+        "counters": get_headline_counters(user, scope),
+    }
+
+
+def get_headline_counters(user, scope):
+    """
+    Task counts by status for the caller's scope.
+    Admins read the precomputed Event Readiness counters (and also get
+    event totals); everyone else gets one GROUP BY over their tasks.
+    """
+    if scope.is_admin:
+        row = frappe.db.sql("""
+            SELECT
+                COUNT(*) AS events,
+                SUM(CASE WHEN %(today)s BETWEEN event_date
+                    AND IFNULL(custom_event_end_date, event_date) THEN 1 ELSE 0 END) AS active_events,
+                AVG(event_readiness) AS avg_readiness,
+                SUM(total_tasks) AS total,
+                SUM(pending_tasks) AS pending,
+                SUM(custom_in_progress_tasks) AS in_progress,
+                SUM(completed_tasks) AS completed,
+                SUM(delayed_tasks) AS delayed
+            FROM `tabEvent Readiness`
+        """, {"today": nowdate()}, as_dict=True)[0]
+
+        return {
+            "events": cint(row.events),
+            "active_events": cint(row.active_events),
+            "avg_readiness": round(flt(row.avg_readiness), 2),
+            "tasks": {
+                "total": cint(row.total),
+                "pending": cint(row.pending),
+                "in_progress": cint(row.in_progress),
+                "completed": cint(row.completed),
+                "delayed": cint(row.delayed),
+            },
+        }
+
+    rows = frappe.db.sql(f"""
+        SELECT status, COUNT(*) AS cnt
+        FROM `tabEvent Task`
+        WHERE {get_task_conditions(user, scope)}
+        GROUP BY status
+    """, as_dict=True)
+
+    counts = {r.status: cint(r.cnt) for r in rows}
+
+    return {
+        "tasks": {
+            "total": sum(counts.values()),
+            "pending": counts.get("Pending", 0),
+            "in_progress": counts.get("In Progress", 0),
+            "completed": counts.get("Completed", 0),
+            "delayed": counts.get("Delayed", 0),
+        },
     }
@@ -92,15 +92,87 @@ fixtures = [
     }
 ]
 
+# the transition ledger is append-only history; it must not pin the
+# task, event or sector it refers to
+ignore_links_on_delete = ["Event Task Transition"]
+
 doc_events = {
     "Event Readiness": {
-        "after_insert": "psn_custom_rdb_app.psn_readiness_dashboard.event_logic.enqueue_default_event_tasks"
+        "after_insert": "psn_custom_rdb_app.psn_readiness_dashboard.event_logic.enqueue_default_event_tasks",
+        "on_update": "psn_custom_rdb_app.psn_readiness_dashboard.response_cache.on_data_change",
+        "on_trash": [
+            "psn_custom_rdb_app.psn_readiness_dashboard.doctype.event_visibility.event_visibility.on_event_readiness_trash",
+            "psn_custom_rdb_app.psn_readiness_dashboard.doctype.event_sector.event_sector.on_event_readiness_trash",
+            "psn_custom_rdb_app.psn_readiness_dashboard.doctype.event_readiness_snapshot.event_readiness_snapshot.on_event_readiness_trash",
+            "psn_custom_rdb_app.psn_readiness_dashboard.response_cache.on_data_change"
+        ]
     },
     "Event Task": {
-        "on_update": "psn_custom_rdb_app.psn_readiness_dashboard.event_logic.update_task_weightage"
+        "on_update": [
+            "psn_custom_rdb_app.psn_readiness_dashboard.event_logic.update_task_weightage",
+            "psn_custom_rdb_app.psn_readiness_dashboard.doctype.event_visibility.event_visibility.on_event_task_change",
+            "psn_custom_rdb_app.psn_readiness_dashboard.realtime_deltas.on_event_task_change",
+            "psn_custom_rdb_app.psn_readiness_dashboard.response_cache.on_data_change"
+        ],
+        "on_trash": [
+            "psn_custom_rdb_app.psn_readiness_dashboard.event_logic.remove_task_from_event_stats",
+            "psn_custom_rdb_app.psn_readiness_dashboard.doctype.event_visibility.event_visibility.on_event_task_change",
+            "psn_custom_rdb_app.psn_readiness_dashboard.realtime_deltas.on_event_task_change",
+            "psn_custom_rdb_app.psn_readiness_dashboard.response_cache.on_data_change"
+        ]
+    },
+    "User Sector KPI": {
+        "on_update": [
+            "psn_custom_rdb_app.psn_readiness_dashboard.access_scope.on_user_sector_kpi_change",
+            "psn_custom_rdb_app.psn_readiness_dashboard.doctype.event_visibility.event_visibility.on_user_sector_kpi_change",
+            "psn_custom_rdb_app.psn_readiness_dashboard.response_cache.on_data_change"
+        ],
+        "on_trash": [
+            "psn_custom_rdb_app.psn_readiness_dashboard.access_scope.on_user_sector_kpi_change",
+            "psn_custom_rdb_app.psn_readiness_dashboard.doctype.event_visibility.event_visibility.on_user_sector_kpi_change",
+            "psn_custom_rdb_app.psn_readiness_dashboard.response_cache.on_data_change"
+        ]
+    },
+    "Sector": {
+        "on_update": [
+            "psn_custom_rdb_app.psn_readiness_dashboard.access_scope.on_sector_change",
+            "psn_custom_rdb_app.psn_readiness_dashboard.response_cache.on_data_change"
+        ],
+        "on_trash": [
+            "psn_custom_rdb_app.psn_readiness_dashboard.access_scope.on_sector_change",
+            "psn_custom_rdb_app.psn_readiness_dashboard.doctype.event_sector.event_sector.on_sector_trash",
+            "psn_custom_rdb_app.psn_readiness_dashboard.doctype.event_readiness_snapshot.event_readiness_snapshot.on_sector_trash",
+            "psn_custom_rdb_app.psn_readiness_dashboard.response_cache.on_data_change"
+        ]
+    },
+    "User": {
+        "on_update": [
+            "psn_custom_rdb_app.psn_readiness_dashboard.access_scope.on_user_change",
+            "psn_custom_rdb_app.psn_readiness_dashboard.response_cache.on_user_change"
+        ]
     }
 }
 
+scheduler_events = {
+    "cron": {
+        "* * * * *": [
+            "psn_custom_rdb_app.psn_readiness_dashboard.event_counters.flush_dirty_counters"
+        ]
+    },
+    "daily": [
+        "psn_custom_rdb_app.psn_readiness_dashboard.event_counters.refresh_all_sector_rollups",
+        "psn_custom_rdb_app.psn_readiness_dashboard.doctype.event_readiness_snapshot.event_readiness_snapshot.take_readiness_snapshots"
+    ]
+}
+
+after_request = [
+    "psn_custom_rdb_app.psn_readiness_dashboard.response_cache.set_etag_headers"
+]
+
+after_migrate = [
+    "psn_custom_rdb_app.psn_readiness_dashboard.db_indexes.ensure_app_indexes"
+]
+
 permission_query_conditions = {
     "Event Task": "psn_custom_rdb_app.psn_readiness_dashboard.doctype.event_task.event_task.get_permission_query_conditions"
 }
@@ -0,0 +1,5 @@
+from psn_custom_rdb_app.psn_readiness_dashboard.db_indexes import ensure_app_indexes
+
+
+def execute():
+    ensure_app_indexes()
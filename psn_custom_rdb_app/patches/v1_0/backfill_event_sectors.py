@@ -0,0 +1,8 @@
+import frappe
+
+from psn_custom_rdb_app.psn_readiness_dashboard.event_counters import recount_event_sectors
+
+
+def execute():
+    for event_name in frappe.get_all("Event Readiness", pluck="name"):
+        recount_event_sectors(event_name)
@@ -0,0 +1,7 @@
+from psn_custom_rdb_app.psn_readiness_dashboard.doctype.event_visibility.event_visibility import (
+    rebuild_all_visibility,
+)
+
+
+def execute():
+    rebuild_all_visibility()
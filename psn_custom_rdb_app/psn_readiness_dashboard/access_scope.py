@@ -0,0 +1,115 @@
+import frappe
+
+ACCESS_SCOPE_CACHE_KEY = "psn_access_scope"
+
+
+def get_access_scope(user=None):
+    """
+    Return the user's sectors, roles, lead flag and admin flag.
+
+    Cached in Redis per user; cleared when User Sector KPI,
+    Sector (members) or User (roles) records change.
+    """
+    user = user or frappe.session.user
+
+    scope = frappe.cache().hget(
+        ACCESS_SCOPE_CACHE_KEY,
+        user,
+        generator=lambda: _build_access_scope(user)
+    )
+
+    return frappe._dict(scope)
+
+
+def _build_access_scope(user):
+    kpis = frappe.get_all(
+        "User Sector KPI",
+        filters={"user": user},
+        fields=["sector", "custom_is_sector_lead"]
+    )
+
+    roles = frappe.get_roles(user)
+
+    return {
+        "sectors": [k.sector for k in kpis],
+        "roles": roles,
+        "is_lead": any(k.custom_is_sector_lead for k in kpis),
+        "is_admin": user == "Administrator" or "Event Readiness Admin" in roles,
+    }
+
+
+def is_event_admin(user=None, scope=None):
+    """
+    Event-level admin: sees every event and every sector row.
+    System Manager counts here; task rules (get_task_filters) use is_admin.
+    """
+    scope = scope or get_access_scope(user)
+    return scope.is_admin or "System Manager" in scope.roles
+
+
+def get_task_filters(user=None, scope=None):
+    """
+    Event Task filters for the given user (same rules as filter_tasks):
+      - Admin → no restriction
+      - Sector Lead → tasks in their sectors
+      - Sector Member → tasks assigned to them, within their sectors
+      - No sector membership → no tasks
+    """
+    user = user or frappe.session.user
+    scope = scope or get_access_scope(user)
+
+    if scope.is_admin:
+        return {}
+
+    if scope.is_lead and scope.sectors:
+        return {"sector": ["in", scope.sectors]}
+
+    if not scope.sectors:
+        return {"incharge": user, "name": "__invalid__"}
+
+    return {"incharge": user, "sector": ["in", scope.sectors]}
+
+
+def get_task_conditions(user=None, scope=None, alias="`tabEvent Task`"):
+    """SQL counterpart of get_task_filters, with values escaped inline."""
+    filters = get_task_filters(user, scope)
+    conditions = []
+
+    if "sector" in filters:
+        sectors_sql = ", ".join(frappe.db.escape(s) for s in filters["sector"][1])
+        conditions.append(f"{alias}.`sector` IN ({sectors_sql})")
+
+    if "incharge" in filters:
+        conditions.append(f"{alias}.`incharge` = {frappe.db.escape(filters['incharge'])}")
+
+    if "name" in filters:
+        conditions.append(f"{alias}.`name` = {frappe.db.escape(filters['name'])}")
+
+    return " AND ".join(conditions) or "1=1"
+
+
+def clear_access_scope_cache(user=None):
+    if user:
+        frappe.cache().hdel(ACCESS_SCOPE_CACHE_KEY, user)
+    else:
+        frappe.cache().delete_value(ACCESS_SCOPE_CACHE_KEY)
+
+
+# -------------------------
+# doc_events
+# -------------------------
+def on_user_sector_kpi_change(doc, method=None):
+    clear_access_scope_cache(doc.user)
+
+    previous = doc.get_doc_before_save()
+    if previous and previous.user != doc.user:
+        clear_access_scope_cache(previous.user)
+
+
+def on_sector_change(doc, method=None):
+    # membership changes can touch many users → drop every cached scope
+    clear_access_scope_cache()
+
+
+def on_user_change(doc, method=None):
+    clear_access_scope_cache(doc.name)
@@ -1,31 +1,76 @@
 import frappe
+from frappe.utils import cint, getdate
+
+from psn_custom_rdb_app.psn_readiness_dashboard.access_scope import get_access_scope
+from psn_custom_rdb_app.psn_readiness_dashboard.response_cache import cached_response
 
 frappe.flags.ignore_csrf = True
 
 
 @frappe.whitelist()
-def get_admin_dashboard_summary():
+def get_admin_dashboard_summary(from_date=None, to_date=None, my_sectors_only=0):
     """
-    Returns dashboard KPIs.
+    Returns dashboard KPIs from one GROUP BY status query.
 
-    - Administrator → sees ALL events and ALL tasks (global dashboard)
-    - Other users  → sees ONLY tasks where they are the 'incharge'
+    Optional scoping:
+      - from_date / to_date → only events whose event_date is in the window
+      - my_sectors_only     → only tasks in the caller's sectors
     """
     user = frappe.session.user
-    total_events = frappe.db.count("Event Readiness")
-    task_filters = {}
 
-    tasks = frappe.get_all(
-        "Event Task",
-        filters=task_filters,
-        fields=["status", "progress"]
-    )
+    event_conditions = []
+    task_conditions = []
+    values = {}
 
-    total_tasks = len(tasks)
-    completed = sum(1 for t in tasks if t.status == "Completed")
-    in_progress = sum(1 for t in tasks if t.status == "In Progress")
-    pending = sum(1 for t in tasks if t.status == "Pending")
-    delayed = sum(1 for t in tasks if t.status == "Delayed")
+    # -----------------------------
+    # 1️⃣ Event date window
+    # -----------------------------
+    if from_date:
+        event_conditions.append("er.event_date >= %(from_date)s")
+        values["from_date"] = getdate(from_date)
+    if to_date:
+        event_conditions.append("er.event_date <= %(to_date)s")
+        values["to_date"] = getdate(to_date)
+
+    # -----------------------------
+    # 2️⃣ Caller's sectors
+    # -----------------------------
+    if cint(my_sectors_only):
+        sectors = get_access_scope(user).sectors
+        if sectors:
+            task_conditions.append("t.sector IN %(sectors)s")
+            values["sectors"] = sectors
+        else:
+            task_conditions.append("1=0")
+
+    # -----------------------------
+    # 3️⃣ Counts
+    # -----------------------------
+    event_where = " AND ".join(event_conditions) or "1=1"
+
+    total_events = frappe.db.sql(f"""
+        SELECT COUNT(*)
+        FROM `tabEvent Readiness` er
+        WHERE {event_where}
+    """, values)[0][0]
+
+    event_join = ""
+    if event_conditions:
+        event_join = "INNER JOIN `tabEvent Readiness` er ON er.name = t.event"
+
+    status_counts = dict(frappe.db.sql(f"""
+        SELECT t.status, COUNT(*)
+        FROM `tabEvent Task` t
+        {event_join}
+        WHERE {" AND ".join(event_conditions + task_conditions) or "1=1"}
+        GROUP BY t.status
+    """, values))
+
+    total_tasks = sum(status_counts.values())
+    completed = status_counts.get("Completed", 0)
+    in_progress = status_counts.get("In Progress", 0)
+    pending = status_counts.get("Pending", 0)
+    delayed = status_counts.get("Delayed", 0)
 
     if total_tasks > 0:
         global_readiness = int((completed / total_tasks) * 100)
@@ -33,7 +78,7 @@ def get_admin_dashboard_summary():
         global_readiness = 0
 
     # -----------------------------
-    # 5️⃣ Response
+    # 4️⃣ Response
     # -----------------------------
     return {
         "user": user,
@@ -53,6 +98,15 @@ def get_active_events_summary():
     Returns event-wise readiness stats.
     Useful for 'Active Events' tiles in the React Admin UI.
     """
+    return cached_response(
+        "get_active_events_summary",
+        {},
+        ("events",),
+        build_active_events_summary
+    )
+
+
+def build_active_events_summary():
     events = frappe.get_all(
         "Event Readiness",
         fields=[
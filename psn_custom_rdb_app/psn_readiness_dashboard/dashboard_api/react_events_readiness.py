@@ -1,8 +1,27 @@
+import math
+
 import frappe
-from frappe.utils import add_days, getdate, nowdate
+from frappe import _
+from frappe.utils import add_days, cint, getdate, nowdate
+
+from psn_custom_rdb_app.psn_readiness_dashboard.access_scope import (
+    get_access_scope,
+    get_task_conditions,
+    get_task_filters,
+    is_event_admin,
+)
+from psn_custom_rdb_app.psn_readiness_dashboard.pagination import (
+    EVENT_TASK_FIELDS,
+    get_task_page,
+    parse_fields,
+)
+from psn_custom_rdb_app.psn_readiness_dashboard.response_cache import cached_response
 
 frappe.flags.ignore_csrf = True
 
+# sector_breakdown label for tasks without a sector
+UNASSIGNED_SECTOR = "Unassigned"
+
 ALLOWED_SORT_FIELDS = {
     "event_date": "event_date",
     "end_date": "custom_event_end_date",
@@ -12,100 +31,153 @@ ALLOWED_SORT_FIELDS = {
 }
 
 
-def is_event_admin(user=None):
-    user = user or frappe.session.user
-    return "Event Readiness Admin" in frappe.get_roles(user)
-
-
 @frappe.whitelist()
 def get_events_for_user(
         sort_by="event_date",
-        sort_order="asc"):
+        sort_order="asc",
+        from_date=None,
+        to_date=None,
+        min_readiness=None,
+        max_readiness=None,
+        sponsor=None,
+        search=None,
+        limit=None,
+        offset=0):
+    filters = {
+        "from_date": from_date,
+        "to_date": to_date,
+        "min_readiness": min_readiness,
+        "max_readiness": max_readiness,
+        "sponsor": sponsor,
+        "search": search,
+    }
+
+    return cached_response(
+        "get_events_for_user",
+        {"sort_by": sort_by, "sort_order": sort_order, "limit": limit, "offset": offset, **filters},
+        ("events", "tasks"),
+        lambda: build_events_for_user(sort_by, sort_order, filters, limit, offset)
+    )
+
+
+def get_event_filter_conditions(filters, values):
+    """
+    WHERE conditions on `tabEvent Readiness` e for the list filters:
+      - from_date / to_date → events overlapping the window
+      - min_readiness / max_readiness → readiness range
+      - sponsor → exact sponsor
+      - search → event name / id contains
+    """
+    filters = frappe._dict(filters or {})
+    conditions = []
+
+    if filters.from_date:
+        conditions.append("IFNULL(e.custom_event_end_date, e.event_date) >= %(from_date)s")
+        values["from_date"] = getdate(filters.from_date)
+    if filters.to_date:
+        conditions.append("e.event_date <= %(to_date)s")
+        values["to_date"] = getdate(filters.to_date)
+    if filters.min_readiness not in (None, ""):
+        conditions.append("IFNULL(e.event_readiness, 0) >= %(min_readiness)s")
+        values["min_readiness"] = cint(filters.min_readiness)
+    if filters.max_readiness not in (None, ""):
+        conditions.append("IFNULL(e.event_readiness, 0) <= %(max_readiness)s")
+        values["max_readiness"] = cint(filters.max_readiness)
+    if filters.sponsor:
+        conditions.append("e.custom_event_sponsor = %(sponsor)s")
+        values["sponsor"] = filters.sponsor
+    if filters.search:
+        conditions.append("(e.event_name LIKE %(search)s OR e.name LIKE %(search)s)")
+        values["search"] = f"%{filters.search}%"
+
+    return conditions
+
+
+def build_events_for_user(sort_by="event_date", sort_order="asc", filters=None, limit=None, offset=0):
     user = frappe.session.user
 
     # -------------------------
-    # 1️⃣ Fetch User Sector List
+    # 1️⃣ Fetch User Sector List (cached access scope)
     # -------------------------
-    user_sector_list = []
-    user_is_lead = False
-
-    kpi_entries = frappe.get_all(
-        "User Sector KPI",
-        filters={"user": user},
-        fields=["sector", "custom_is_sector_lead"]
-    )
-
-    if kpi_entries:
-        user_sector_list = [entry.sector for entry in kpi_entries]
-        user_is_lead = any(
-            entry.custom_is_sector_lead for entry in kpi_entries)
+    scope = get_access_scope(user)
+    user_sector_list = scope.sectors
+    user_is_lead = scope.is_lead
 
     # -------------------------
     # 2️⃣ Administrator → can see ALL events
+    #    Others → events with tasks in their sectors,
+    #    joined through the maintained Event Visibility rows
     # -------------------------
-    if "System Manager" in frappe.get_roles(user):
-        allowed_event_names = None  # None = fetch all
-    else:
-        # -------------------------
-        # 3️⃣ Fetch tasks belonging to user's sectors
-        # -------------------------
-        if user_sector_list:
-            tasks = frappe.get_all(
-                "Event Task",
-                filters={"sector": ["in", user_sector_list]},
-                fields=["event"],
-                distinct=True
-            )
-        else:
-            tasks = []
-
-        # Extract event names from tasks
-        allowed_event_names = list({t.event for t in tasks if t.event})
+    is_admin = is_event_admin(user, scope)
+
+    if not is_admin and not user_sector_list:
+        return {
+            "events": [],
+            "total_count": 0,
+            "user": user,
+            "user_sector_list": user_sector_list,
+            "user_is_lead": user_is_lead
+        }
+
+    visibility_join = "" if is_admin else """
+        INNER JOIN `tabEvent Visibility` v
+            ON v.event = e.name
+            AND v.user = %(user)s
+            AND v.via_sector = 1
+    """
 
     # -------------------------
-    # 4️⃣ Build filters for Events
+    # 3️⃣ Filters, sort + pagination
     # -------------------------
-    event_filters = {}
-
-    if allowed_event_names is not None:
-        # If user has NO tasks in their sectors → return NO events
-        if not allowed_event_names:
-            return {
-                "events": [],
-                "user": user,
-                "user_sector_list": user_sector_list,
-                "user_is_lead": user_is_lead
-            }
-
-        event_filters["name"] = ["in", allowed_event_names]
+    values = {"user": user}
+    where = " AND ".join(get_event_filter_conditions(filters, values)) or "1=1"
 
-    sort_order = sort_order.lower()
+    sort_order = (sort_order or "").lower()
     if sort_order not in ("asc", "desc"):
         sort_order = "asc"
     order_field = ALLOWED_SORT_FIELDS.get(sort_by, "event_date")
 
-    events = frappe.get_all(
-        "Event Readiness",
-        filters=event_filters,
-        fields=[
-            "name",
-            "event_name",
-            "event_date",
-            "custom_event_end_date",
-            "custom_in_progress_tasks",
-            "total_tasks",
-            "completed_tasks",
-            "delayed_tasks",
-            "event_readiness",
-            "custom_event_sponsor",
-            "creation",
-            "owner",
-        ],
-        order_by=f"{order_field} {sort_order}"
-    )
+    limit_clause = ""
+    if cint(limit) > 0:
+        limit_clause = "LIMIT %(limit)s OFFSET %(offset)s"
+        values["limit"] = cint(limit)
+        values["offset"] = max(cint(offset), 0)
+
+    events = frappe.db.sql(f"""
+        SELECT
+            e.name,
+            e.event_name,
+            e.event_date,
+            e.custom_event_end_date,
+            e.custom_in_progress_tasks,
+            e.total_tasks,
+            e.completed_tasks,
+            e.delayed_tasks,
+            e.event_readiness,
+            e.custom_event_sponsor,
+            e.creation,
+            e.owner
+        FROM `tabEvent Readiness` e
+        {visibility_join}
+        WHERE {where}
+        ORDER BY e.`{order_field}` {sort_order}, e.name {sort_order}
+        {limit_clause}
+    """, values, as_dict=True)
+
+    # an unpaged or short first page already holds every match
+    if not limit_clause or (not values["offset"] and len(events) < values["limit"]):
+        total_count = len(events)
+    else:
+        total_count = frappe.db.sql(f"""
+            SELECT COUNT(*)
+            FROM `tabEvent Readiness` e
+            {visibility_join}
+            WHERE {where}
+        """, values)[0][0]
 
     return {
         "events": events,
+        "total_count": total_count,
         "user": user,
         "user_sector_list": user_sector_list,
         "user_is_lead": user_is_lead
@@ -114,78 +186,104 @@ def get_events_for_user(
 
 @frappe.whitelist()
 def get_event_overview(event_name):
+    return cached_response(
+        "get_event_overview",
+        {"event_name": event_name},
+        ("events", "tasks"),
+        lambda: build_event_overview(event_name)
+    )
+
+
+def build_event_overview(event_name):
     """
     Returns:
       - event detail fields
       - breakdown counts (summary)
       - unique sectors
+      - per-sector breakdown
+
+    Counts come from the precomputed Event Sector rows (or, for
+    sector members, one grouped query over their own tasks).
     """
 
     user = frappe.session.user
 
     # -------------------------
-    # 1️⃣ Fetch Event
-    # -------------------------
-    event = frappe.get_doc("Event Readiness", event_name)
-
+    # 1️⃣ Fetch Event header (cached)
     # -------------------------
-    # 2️⃣ Load User Sector Permissions
-    # -------------------------
-    user_sector_list = []
-    user_is_lead = False
-
-    kpi_entries = frappe.get_all(
-        "User Sector KPI",
-        filters={"user": user},
-        fields=["sector", "custom_is_sector_lead"]
+    event = frappe.get_cached_value(
+        "Event Readiness",
+        event_name,
+        ["name", "event_name", "event_date", "custom_event_end_date", "event_readiness",
+         "total_tasks", "pending_tasks", "custom_in_progress_tasks", "completed_tasks", "delayed_tasks"],
+        as_dict=True
     )
 
-    if kpi_entries:
-        user_sector_list = [e.sector for e in kpi_entries]
-        user_is_lead = any(e.custom_is_sector_lead for e in kpi_entries)
+    if not event:
+        frappe.throw(_("Event not found"), frappe.DoesNotExistError)
 
     # -------------------------
-    # 3️⃣ Build task filters (for summary only)
+    # 2️⃣ Load User Sector Permissions (cached access scope)
+    #    Non-admins need an Event Visibility row for the event; while that
+    #    row is missing (rebuild pending, events older than the table) fall
+    #    back to checking the event's tasks directly
     # -------------------------
-    task_filters = {"event": event_name}
+    scope = get_access_scope(user)
+    user_sector_list = scope.sectors
+    user_is_lead = scope.is_lead
 
-    if not is_event_admin(user):
-        if user_is_lead and user_sector_list:
-            task_filters["sector"] = ["in", user_sector_list]
-        else:
-            task_filters["incharge"] = user
+    if not is_event_admin(user, scope) and not can_view_event(event.name, user, scope):
+        frappe.throw(_("Not permitted to view this event"), frappe.PermissionError)
 
     # -------------------------
-    # 4️⃣ Fetch ONLY statuses for summary
+    # 3️⃣ Per-sector counts
+    #    Admins / leads read the precomputed Event Sector rows;
+    #    members only see their own tasks → grouped task query.
+    #    Tasks without a sector land in an "Unassigned" row.
     # -------------------------
-    task_statuses = frappe.get_all(
-        "Event Task",
-        filters=task_filters,
-        fields=["status"]
-    )
+    task_filters = get_task_filters(user, scope)
+
+    if "incharge" in task_filters:
+        breakdown = frappe.db.sql(f"""
+            SELECT
+                NULLIF(sector, '') AS sector,
+                COUNT(*) AS total_tasks,
+                SUM(CASE WHEN status = 'Pending' THEN 1 ELSE 0 END) AS pending_tasks,
+                SUM(CASE WHEN status = 'In Progress' THEN 1 ELSE 0 END) AS in_progress_tasks,
+                SUM(CASE WHEN status = 'Completed' THEN 1 ELSE 0 END) AS completed_tasks,
+                SUM(CASE WHEN status = 'Delayed' THEN 1 ELSE 0 END) AS delayed_tasks,
+                IFNULL(FLOOR(SUM(CASE WHEN status = 'Completed' THEN 1 ELSE 0 END) * 100
+                    / NULLIF(COUNT(*), 0)), 0) AS readiness
+            FROM `tabEvent Task`
+            WHERE event = %(event)s
+                AND {get_task_conditions(user, scope)}
+            GROUP BY NULLIF(sector, '')
+            ORDER BY sector IS NULL, sector
+        """, {"event": event_name, "user": user}, as_dict=True)
+    else:
+        sector_filters = {"event": event_name, "total_tasks": [">", 0]}
+        if "sector" in task_filters:
+            sector_filters["sector"] = task_filters["sector"]
+
+        breakdown = frappe.get_all(
+            "Event Sector",
+            filters=sector_filters,
+            fields=["sector", "total_tasks", "pending_tasks", "in_progress_tasks",
+                    "completed_tasks", "delayed_tasks", "readiness"],
+            order_by="sector asc"
+        )
 
-    # -------------------------
-    # 5️⃣ Build summary counts
-    # -------------------------
-    total = len(task_statuses)
-    pending = sum(1 for t in task_statuses if t.status == "Pending")
-    in_progress = sum(1 for t in task_statuses if t.status == "In Progress")
-    completed = sum(1 for t in task_statuses if t.status == "Completed")
-    delayed = sum(1 for t in task_statuses if t.status == "Delayed")
+        # Event Sector only covers tasks with a sector; the rest is the
+        # gap to the event counters (admins see every task)
+        if "sector" not in task_filters:
+            unassigned = get_unassigned_counts(event, breakdown)
+            if unassigned.total_tasks:
+                breakdown.append(unassigned)
 
-    # -------------------------
-    # 6️⃣ Unique sectors (light query)
-    # -------------------------
-    sectors = sorted({
-        t.sector for t in frappe.get_all(
-            "Event Task",
-            filters={"event": event_name},
-            fields=["sector"]
-        ) if t.sector
-    })
+    sectors = [r.sector for r in breakdown if r.sector]
 
     # -------------------------
-    # 7️⃣ Response payload
+    # 4️⃣ Response payload
     # -------------------------
     return {
         "event": {
@@ -196,61 +294,85 @@ def get_event_overview(event_name):
             "event_readiness": event.event_readiness,
         },
         "summary": {
-            "total": total,
-            "pending": pending,
-            "in_progress": in_progress,
-            "completed": completed,
-            "delayed": delayed,
+            "total": sum(cint(r.total_tasks) for r in breakdown),
+            "pending": sum(cint(r.pending_tasks) for r in breakdown),
+            "in_progress": sum(cint(r.in_progress_tasks) for r in breakdown),
+            "completed": sum(cint(r.completed_tasks) for r in breakdown),
+            "delayed": sum(cint(r.delayed_tasks) for r in breakdown),
         },
         "sectors": sectors,
+        "sector_breakdown": [
+            {
+                "sector": r.sector or UNASSIGNED_SECTOR,
+                "is_unassigned": not r.sector,
+                "total": cint(r.total_tasks),
+                "pending": cint(r.pending_tasks),
+                "in_progress": cint(r.in_progress_tasks),
+                "completed": cint(r.completed_tasks),
+                "delayed": cint(r.delayed_tasks),
+                "readiness": cint(r.readiness),
+            }
+            for r in breakdown
+        ],
         "user": user,
         "user_sector_list": user_sector_list,
         "user_is_lead": user_is_lead,
     }
 
 
-@frappe.whitelist()
-def get_event_tasks(event_name):
-    user = frappe.session.user
-    user_sector_list = []
-    user_is_lead = False
+def get_unassigned_counts(event, breakdown):
+    """Counts of the event's tasks without a sector: event counters minus sector rows."""
+    row = frappe._dict(sector=None)
 
-    kpi_entries = frappe.get_all(
-        "User Sector KPI",
-        filters={"user": user},
-        fields=["sector", "custom_is_sector_lead"]
+    for field, event_field in (
+        ("total_tasks", "total_tasks"),
+        ("pending_tasks", "pending_tasks"),
+        ("in_progress_tasks", "custom_in_progress_tasks"),
+        ("completed_tasks", "completed_tasks"),
+        ("delayed_tasks", "delayed_tasks"),
+    ):
+        row[field] = max(cint(event.get(event_field)) - sum(cint(r[field]) for r in breakdown), 0)
+
+    row.readiness = (
+        math.floor(row.completed_tasks * 100 / row.total_tasks) if row.total_tasks else 0
     )
+    return row
+
 
-    if kpi_entries:
-        user_sector_list = [e.sector for e in kpi_entries]
-        user_is_lead = any(e.custom_is_sector_lead for e in kpi_entries)
+def can_view_event(event, user, scope):
+    """Event Visibility row, else a task in one of the user's sectors or assigned to them."""
+    if frappe.db.exists("Event Visibility", {"user": user, "event": event}):
+        return True
 
+    if scope.sectors and frappe.db.exists(
+        "Event Task", {"event": event, "sector": ["in", scope.sectors]}
+    ):
+        return True
+
+    return bool(frappe.db.exists("Event Task", {"event": event, "incharge": user}))
+
+
+@frappe.whitelist()
+def get_event_tasks(event_name, page_size=None, cursor=None, fields=None):
     # -------------------------
-    # 2️⃣ Build task filters
+    # 1️⃣ Build task filters (cached access scope)
     # -------------------------
-    task_filters = {"event": event_name}
+    task_filters = {"event": event_name, **get_task_filters()}
+    fields = parse_fields(fields, EVENT_TASK_FIELDS, required=("name", "creation"))
 
-    if not is_event_admin(user):
-        if user_is_lead and user_sector_list:
-            task_filters["sector"] = ["in", user_sector_list]
-        else:
-            task_filters["incharge"] = user
+    # -------------------------
+    # 2️⃣ Keyset page on (creation, name)
+    # -------------------------
+    if page_size:
+        return get_task_page(task_filters, "creation", fields, page_size, cursor)
 
     # -------------------------
-    # 3️⃣ Fetch tasks
+    # 3️⃣ Fetch all tasks
     # -------------------------
     tasks = frappe.get_all(
         "Event Task",
         filters=task_filters,
-        fields=[
-            "name",
-            "l2_task_name",
-            "sector",
-            "status",
-            "incharge",
-            "due_date",
-            "progress"
-        ],
+        fields=fields,
         order_by="creation asc"
     )
 
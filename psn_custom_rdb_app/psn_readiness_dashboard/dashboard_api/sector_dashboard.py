@@ -1,6 +1,8 @@
 import frappe
 from frappe.utils import cint
 
+from psn_custom_rdb_app.psn_readiness_dashboard.response_cache import cached_response
+
 
 @frappe.whitelist()
 def get_all_sectors():
@@ -53,6 +55,15 @@ def get_allowed_sectors(user, roles):
 
 @frappe.whitelist()
 def get_sectors_dashboard():
+    return cached_response(
+        "get_sectors_dashboard",
+        {},
+        ("sectors", "tasks"),
+        build_sectors_dashboard
+    )
+
+
+def build_sectors_dashboard():
     user = frappe.session.user
     roles = frappe.get_roles(user)
 
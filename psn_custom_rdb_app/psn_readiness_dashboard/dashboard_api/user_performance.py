@@ -1,122 +1,97 @@
 import frappe
+from frappe.utils import cint, flt
+
+from psn_custom_rdb_app.psn_readiness_dashboard.access_scope import get_access_scope
+
+LEADERBOARD_SORT_FIELDS = {
+    "performance": "performance",
+    "tasks_completed": "tasks_completed",
+    "tasks_assigned": "tasks_assigned",
+    "on_time": "on_time_completion",
+    "response_time": "avg_response_time",
+    "name": "full_name",
+}
 
 
 @frappe.whitelist()
-def get_user_performance():
+def get_user_performance(sort_by="performance", sort_order="desc", limit=None, offset=0):
     current_user = frappe.session.user
 
     is_admin = frappe.has_role("Event Readiness Admin", current_user)
 
     # sectors where current user is a member or lead
-    my_kpis = frappe.get_all(
-        "User Sector KPI",
-        filters={"user": current_user},
-        fields=["sector", "custom_is_sector_lead"]
-    )
-
-    my_sectors = {k.sector for k in my_kpis}
-    is_sector_lead = any(k.custom_is_sector_lead for k in my_kpis)
+    scope = get_access_scope(current_user)
 
     # -------------------------------------------------
-    # 1️⃣ Build aggregated leaderboard (as confirmed)
+    # 1️⃣ APPLY VISIBILITY RULES (in the WHERE clause)
     # -------------------------------------------------
-    rows = frappe.get_all(
-        "User Sector KPI",
-        fields=[
-            "user",
-            "sector",
-            "kpi_score",
-            "avg_response_hrs",
-            "on_time_percentage",
-            "completed_tasks",
-            "pending_tasks",
-            "in_progress_tasks",
-            "delayed_tasks",
-            "total_tasks",
-            "custom_is_sector_lead"
-        ]
-    )
-
-    from collections import defaultdict
-    users = defaultdict(lambda: {
-        "name": "",
-        "tasks_completed": 0,
-        "tasks_assigned": 0,
-        "pending": 0,
-        "in_progress": 0,
-        "delayed": 0,
-        "kpi_scores": [],
-        "response_times": [],
-        "on_time_weighted_sum": 0,
-        "on_time_weight": 0,
-        "is_lead": False,
-        "sectors": set()
-    })
-
-    for r in rows:
-        u = users[r.user]
-        u["name"] = frappe.db.get_value("User", r.user, "full_name") or r.user
-        u["sectors"].add(r.sector)
-
-        u["tasks_completed"] += r.completed_tasks or 0
-        u["tasks_assigned"] += r.total_tasks or 0
-        u["pending"] += r.pending_tasks or 0
-        u["in_progress"] += r.in_progress_tasks or 0
-        u["delayed"] += r.delayed_tasks or 0
-
-        if r.kpi_score is not None:
-            u["kpi_scores"].append(r.kpi_score)
-
-        if r.avg_response_hrs and r.avg_response_hrs > 0:
-            u["response_times"].append(r.avg_response_hrs)
+    values = {"current_user": current_user}
 
-        if r.on_time_percentage is not None and r.completed_tasks:
-            u["on_time_weighted_sum"] += r.on_time_percentage * r.completed_tasks
-            u["on_time_weight"] += r.completed_tasks
-
-        if r.custom_is_sector_lead:
-            u["is_lead"] = True
+    if is_admin:
+        visibility = "1=1"
+    elif scope.is_lead and scope.sectors:
+        visibility = """k.user IN (
+            SELECT DISTINCT v.user
+            FROM `tabUser Sector KPI` v
+            WHERE v.sector IN %(my_sectors)s
+        )"""
+        values["my_sectors"] = scope.sectors
+    else:
+        # sector member → only self
+        visibility = "k.user = %(current_user)s"
 
     # -------------------------------------------------
-    # 2️⃣ Build final list
+    # 2️⃣ Sort + pagination
     # -------------------------------------------------
-    leaderboard = []
-
-    for user, u in users.items():
-        record = {
-            "user": user,
-            "name": u["name"],
-            "role": "Sector Lead" if u["is_lead"] else "Sector Member",
-            "tasksCompleted": u["tasks_completed"],
-            "tasksAssigned": u["tasks_assigned"],
-            "avgResponseTime": round(
-                sum(u["response_times"]) / len(u["response_times"]), 2
-            ) if u["response_times"] else 0,
-            "onTimeCompletion": round(
-                u["on_time_weighted_sum"] / u["on_time_weight"], 2
-            ) if u["on_time_weight"] else 0,
-            "performance": round(
-                sum(u["kpi_scores"]) / len(u["kpi_scores"]), 2
-            ) if u["kpi_scores"] else 0,
-            "sectors": list(u["sectors"])
-        }
+    order_field = LEADERBOARD_SORT_FIELDS.get(sort_by, "performance")
+    sort_order = "asc" if (sort_order or "").lower() == "asc" else "desc"
 
-        leaderboard.append(record)
+    limit_clause = ""
+    if cint(limit) > 0:
+        limit_clause = "LIMIT %(limit)s OFFSET %(offset)s"
+        values["limit"] = cint(limit)
+        values["offset"] = max(cint(offset), 0)
 
     # -------------------------------------------------
-    # 3️⃣ APPLY VISIBILITY RULES
+    # 3️⃣ Aggregated leaderboard
     # -------------------------------------------------
-    if is_admin:
-        return leaderboard
-
-    if is_sector_lead:
-        return [
-            u for u in leaderboard
-            if set(u["sectors"]) & my_sectors
-        ]
+    rows = frappe.db.sql(f"""
+        SELECT
+            k.user,
+            IFNULL(u.full_name, k.user) AS full_name,
+            MAX(k.custom_is_sector_lead) AS is_lead,
+            SUM(IFNULL(k.completed_tasks, 0)) AS tasks_completed,
+            SUM(IFNULL(k.total_tasks, 0)) AS tasks_assigned,
+            IFNULL(AVG(CASE WHEN k.avg_response_hrs > 0 THEN k.avg_response_hrs END), 0)
+                AS avg_response_time,
+            IFNULL(
+                SUM(CASE WHEN k.on_time_percentage IS NOT NULL AND k.completed_tasks > 0
+                    THEN k.on_time_percentage * k.completed_tasks END)
+                / NULLIF(SUM(CASE WHEN k.on_time_percentage IS NOT NULL AND k.completed_tasks > 0
+                    THEN k.completed_tasks END), 0),
+                0
+            ) AS on_time_completion,
+            IFNULL(AVG(k.kpi_score), 0) AS performance,
+            GROUP_CONCAT(DISTINCT k.sector ORDER BY k.sector SEPARATOR '|') AS sectors
+        FROM `tabUser Sector KPI` k
+        LEFT JOIN `tabUser` u ON u.name = k.user
+        WHERE {visibility}
+        GROUP BY k.user, u.full_name
+        ORDER BY {order_field} {sort_order}, k.user asc
+        {limit_clause}
+    """, values, as_dict=True)
 
-    # sector member → only self
     return [
-        u for u in leaderboard
-        if u["user"] == current_user
+        {
+            "user": r.user,
+            "name": r.full_name,
+            "role": "Sector Lead" if cint(r.is_lead) else "Sector Member",
+            "tasksCompleted": cint(r.tasks_completed),
+            "tasksAssigned": cint(r.tasks_assigned),
+            "avgResponseTime": round(flt(r.avg_response_time), 2),
+            "onTimeCompletion": round(flt(r.on_time_completion), 2),
+            "performance": round(flt(r.performance), 2),
+            "sectors": r.sectors.split("|") if r.sectors else []
+        }
+        for r in rows
     ]
@@ -1,21 +1,26 @@
-frappe.query_reports["Event Readiness Progress Chart Source"] = {
-    filters: [],
+frappe.provide("frappe.dashboards.chart_sources");
 
-    get_chart_data: function() {
-        return frappe.call({
-            method: "psn_custom_rdb_app.psn_readiness_dashboard.event_logic.get_event_progress"
-        }).then(r => {
-            const data = r.message || [];
-            return {
-                labels: data.map(d => d.event_name),
-                datasets: [
-                    {
-                        name: "Readinessssds %",
-                        values: data.map(d => d.progress)
-                    }
-                ],
-                type: "bar"
-            };
-        });
-    }
+frappe.dashboards.chart_sources["Event Readiness Progress Chart Source"] = {
+    method: "psn_custom_rdb_app.psn_readiness_dashboard.dashboard_chart_source.event_readiness_progress_chart_source.event_readiness_progress_chart_source.get",
+    filters: [
+        {
+            fieldname: "group_by",
+            label: __("Group By"),
+            fieldtype: "Select",
+            options: ["Event", "Sector", "Week"],
+            default: "Event"
+        },
+        {
+            fieldname: "event",
+            label: __("Event"),
+            fieldtype: "Link",
+            options: "Event Readiness"
+        },
+        {
+            fieldname: "sector",
+            label: __("Sector"),
+            fieldtype: "Link",
+            options: "Sector"
+        }
+    ]
 };
@@ -0,0 +1,156 @@
+# Copyright (c) 2025, PSN and contributors
+# For license information, please see license.txt
+
+import json
+
+import frappe
+from frappe.utils import cint
+
+from psn_custom_rdb_app.psn_readiness_dashboard.access_scope import (
+    get_access_scope,
+    get_task_conditions,
+    is_event_admin,
+)
+from psn_custom_rdb_app.psn_readiness_dashboard.response_cache import cached_response
+
+GROUP_BY_OPTIONS = ("Event", "Sector", "Week")
+
+
+@frappe.whitelist()
+def get(
+    chart_name=None,
+    chart=None,
+    no_cache=None,
+    filters=None,
+    from_date=None,
+    to_date=None,
+    timespan=None,
+    time_interval=None,
+    heatmap_year=None,
+):
+    """
+    Pre-bucketed readiness series for Workspace charts.
+
+    filters:
+      - group_by: Event (default) / Sector / Week (of due date)
+      - event, sector: optional narrowing
+
+    Served through the data-versioned response cache, so unchanged data
+    costs one Redis read whatever the task volume.
+    """
+    if isinstance(filters, str):
+        filters = json.loads(filters or "{}")
+    filters = frappe._dict(filters or {})
+
+    group_by = filters.group_by if filters.group_by in GROUP_BY_OPTIONS else "Event"
+    args = {"group_by": group_by, "event": filters.event, "sector": filters.sector}
+
+    return cached_response(
+        "event_readiness_progress_chart_source",
+        args,
+        ("events", "tasks", "sectors"),
+        lambda: build_chart_data(**args)
+    )
+
+
+def build_chart_data(group_by="Event", event=None, sector=None):
+    if group_by == "Sector":
+        return _by_sector(event, sector)
+    if group_by == "Week":
+        return _by_due_week(event, sector)
+    return _by_event(event)
+
+
+def _by_event(event=None):
+    user = frappe.session.user
+    values = {"user": user, "event": event}
+    conditions = ["1=1"]
+
+    if event:
+        conditions.append("e.name = %(event)s")
+    if not is_event_admin(user):
+        conditions.append("""EXISTS (
+            SELECT 1 FROM `tabEvent Visibility` v
+            WHERE v.user = %(user)s AND v.event = e.name
+        )""")
+
+    rows = frappe.db.sql(f"""
+        SELECT e.name, e.event_name, e.event_readiness, e.total_tasks, e.completed_tasks
+        FROM `tabEvent Readiness` e
+        WHERE {" AND ".join(conditions)}
+        ORDER BY e.event_date asc, e.name asc
+    """, values, as_dict=True)
+
+    return {
+        "labels": [r.event_name or r.name for r in rows],
+        "datasets": [
+            {"name": "Readiness %", "values": [cint(r.event_readiness) for r in rows]},
+        ],
+        "type": "bar",
+    }
+
+
+def _by_sector(event=None, sector=None):
+    scope = get_access_scope()
+    values = {"event": event, "sector": sector, "sectors": scope.sectors}
+    conditions = ["1=1"]
+
+    if event:
+        conditions.append("es.event = %(event)s")
+    if sector:
+        conditions.append("es.sector = %(sector)s")
+    if not is_event_admin(scope=scope):
+        if not scope.sectors:
+            return {"labels": [], "datasets": [], "type": "bar"}
+        conditions.append("es.sector IN %(sectors)s")
+
+    rows = frappe.db.sql(f"""
+        SELECT
+            es.sector,
+            SUM(es.total_tasks) AS total_tasks,
+            SUM(es.completed_tasks) AS completed_tasks,
+            IFNULL(FLOOR(SUM(es.completed_tasks) * 100 / NULLIF(SUM(es.total_tasks), 0)), 0)
+                AS readiness
+        FROM `tabEvent Sector` es
+        WHERE {" AND ".join(conditions)}
+        GROUP BY es.sector
+        ORDER BY es.sector asc
+    """, values, as_dict=True)
+
+    return {
+        "labels": [r.sector for r in rows],
+        "datasets": [
+            {"name": "Readiness %", "values": [cint(r.readiness) for r in rows]},
+        ],
+        "type": "bar",
+    }
+
+
+def _by_due_week(event=None, sector=None):
+    values = {"event": event, "sector": sector}
+    conditions = ["t.due_date IS NOT NULL", get_task_conditions(alias="t")]
+
+    if event:
+        conditions.append("t.event = %(event)s")
+    if sector:
+        conditions.append("t.sector = %(sector)s")
+
+    rows = frappe.db.sql(f"""
+        SELECT
+            DATE_SUB(t.due_date, INTERVAL WEEKDAY(t.due_date) DAY) AS week_start,
+            SUM(CASE WHEN t.status = 'Completed' THEN 1 ELSE 0 END) AS completed,
+            SUM(CASE WHEN t.status = 'Completed' THEN 0 ELSE 1 END) AS open_tasks
+        FROM `tabEvent Task` t
+        WHERE {" AND ".join(conditions)}
+        GROUP BY week_start
+        ORDER BY week_start asc
+    """, values, as_dict=True)
+
+    return {
+        "labels": [str(r.week_start) for r in rows],
+        "datasets": [
+            {"name": "Completed", "values": [cint(r.completed) for r in rows]},
+            {"name": "Open", "values": [cint(r.open_tasks) for r in rows]},
+        ],
+        "type": "bar",
+    }
@@ -0,0 +1,67 @@
+import frappe
+
+# Composite indexes owned by this app.
+# Single-column lookups (Event Task.event, User Sector KPI.user) are
+# served by the leftmost column of the composite indexes below.
+APP_INDEXES = [
+    # Event Readiness
+    ("Event Readiness", "psn_event_readiness_event_date", ["event_date"]),
+    # Event Task
+    ("Event Task", "psn_event_task_event_sector", ["event", "sector"]),
+    ("Event Task", "psn_event_task_event_incharge", ["event", "incharge"]),
+    ("Event Task", "psn_event_task_sector_incharge_status", ["sector", "incharge", "status"]),
+    ("Event Task", "psn_event_task_due_date", ["due_date"]),
+    # User Sector KPI
+    ("User Sector KPI", "psn_user_sector_kpi_user_sector", ["user", "sector"]),
+    ("User Sector KPI", "psn_user_sector_kpi_sector_user", ["sector", "user"]),
+    # Sector Member
+    ("Sector Member", "psn_sector_member_parent_lead", ["parent", "is_sector_lead"]),
+    # Event Task Transition
+    ("Event Task Transition", "psn_transition_task_time", ["task", "transitioned_on"]),
+    ("Event Task Transition", "psn_transition_event_time", ["event", "transitioned_on"]),
+    (
+        "Event Task Transition",
+        "psn_transition_incharge_sector_status_time",
+        ["incharge", "sector", "to_status", "transitioned_on"]
+    ),
+    # Event Visibility
+    ("Event Visibility", "psn_visibility_user_event", ["user", "event", "via_sector", "via_incharge"]),
+    ("Event Visibility", "psn_visibility_event", ["event"]),
+    # Event Readiness Snapshot
+    ("Event Readiness Snapshot", "psn_snapshot_event_sector_date", ["event", "sector", "snapshot_date"]),
+    ("Event Readiness Snapshot", "psn_snapshot_sector_date", ["sector", "snapshot_date"]),
+]
+
+
+def ensure_app_indexes(doctype=None):
+    """
+    Create any missing app-owned index.
+    Runs from the index patch and after every `bench migrate`.
+    """
+    for index_doctype, index_name, fields in APP_INDEXES:
+        if doctype and index_doctype != doctype:
+            continue
+
+        if not frappe.db.table_exists(index_doctype):
+            continue
+
+        frappe.db.add_index(index_doctype, fields, index_name=index_name)
+
+
+@frappe.whitelist()
+def get_app_indexes():
+    """List the indexes this app owns and whether each one exists."""
+    frappe.only_for("System Manager")
+
+    return [
+        {
+            "doctype": index_doctype,
+            "index_name": index_name,
+            "fields": fields,
+            "exists": bool(
+                frappe.db.table_exists(index_doctype)
+                and frappe.db.has_index(f"tab{index_doctype}", index_name)
+            ),
+        }
+        for index_doctype, index_name, fields in APP_INDEXES
+    ]
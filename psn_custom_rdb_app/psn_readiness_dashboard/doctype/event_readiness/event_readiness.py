@@ -23,10 +23,13 @@ def get_permission_query_conditions(user, doctype=None):
         return None
 
     # Sector Member → only events where user has tasks
+    # (indexed lookup on the maintained Event Visibility rows)
     return f"""
-        `tabEvent Readiness`.`name` IN (
-            SELECT DISTINCT event
-            FROM `tabEvent Task`
-            WHERE incharge = {frappe.db.escape(user)}
+        EXISTS (
+            SELECT 1
+            FROM `tabEvent Visibility` v
+            WHERE v.user = {frappe.db.escape(user)}
+                AND v.event = `tabEvent Readiness`.`name`
+                AND v.via_incharge = 1
         )
     """
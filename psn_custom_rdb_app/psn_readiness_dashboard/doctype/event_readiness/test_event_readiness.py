@@ -1,8 +1,21 @@
 # Copyright (c) 2025, PSN and Contributors
 # See license.txt
 
-# import frappe
+import frappe
 from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, nowdate
+
+
+def make_event(event_name=None, **kwargs):
+	return frappe.get_doc({
+		"doctype": "Event Readiness",
+		"event_name": event_name or f"_Test Event {frappe.generate_hash(length=8)}",
+		"event_date": nowdate(),
+		"custom_event_end_date": add_days(nowdate(), 1),
+		"custom_event_sponsor": "_Test Sponsor",
+		"use_default_tasks": 0,
+		**kwargs
+	}).insert(ignore_permissions=True)
 
 
 class TestEventReadiness(FrappeTestCase):
@@ -0,0 +1,245 @@
+# Copyright (c) 2026, PSN and contributors
+# For license information, please see license.txt
+
+import hashlib
+import json
+import math
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_days, cint, date_diff, getdate, now, nowdate
+
+from psn_custom_rdb_app.psn_readiness_dashboard.access_scope import is_event_admin
+from psn_custom_rdb_app.psn_readiness_dashboard.db_indexes import ensure_app_indexes
+
+SNAPSHOT_COUNTER_FIELDS = [
+    "total_tasks", "pending_tasks", "in_progress_tasks", "completed_tasks", "delayed_tasks"
+]
+
+SNAPSHOT_FIELDS = [
+    "name", "creation", "modified", "owner", "modified_by", "docstatus", "idx",
+    "snapshot_date", "event", "sector", "readiness", *SNAPSHOT_COUNTER_FIELDS
+]
+
+DEFAULT_SERIES_DAYS = 30
+DEFAULT_SERIES_POINTS = 60
+MAX_SERIES_DAYS = 730
+MAX_SERIES_POINTS = 366
+
+
+class EventReadinessSnapshot(Document):
+    pass
+
+
+def on_doctype_update():
+    ensure_app_indexes("Event Readiness Snapshot")
+
+
+def get_snapshot_name(snapshot_date, event_name, sector=None):
+    # one row per (date, event, sector) → re-running a day replaces it
+    return hashlib.md5(f"{snapshot_date}::{event_name}::{sector or ''}".encode()).hexdigest()
+
+
+# -------------------------
+# Scheduled snapshot
+# -------------------------
+def take_readiness_snapshots():
+    """
+    Scheduled daily: snapshot today's readiness for every event whose
+    tasks changed since the last snapshot run. Event totals come from
+    the Event Readiness counters, per-sector rows from Event Sector.
+    """
+    events = get_changed_events()
+    if not events:
+        return 0
+
+    today = nowdate()
+    now_ts = now()
+    user = frappe.session.user
+
+    event_rows = frappe.db.sql("""
+        SELECT
+            name AS event, NULL AS sector, event_readiness AS readiness,
+            total_tasks, pending_tasks, custom_in_progress_tasks AS in_progress_tasks,
+            completed_tasks, delayed_tasks
+        FROM `tabEvent Readiness`
+        WHERE name IN %(events)s
+    """, {"events": events}, as_dict=True)
+
+    sector_rows = frappe.db.sql("""
+        SELECT
+            event, sector, readiness,
+            total_tasks, pending_tasks, in_progress_tasks, completed_tasks, delayed_tasks
+        FROM `tabEvent Sector`
+        WHERE event IN %(events)s
+    """, {"events": events}, as_dict=True)
+
+    values = [
+        (
+            get_snapshot_name(today, r.event, r.sector), now_ts, now_ts, user, user, 0, 0,
+            today, r.event, r.sector, cint(r.readiness),
+            *(cint(r[f]) for f in SNAPSHOT_COUNTER_FIELDS)
+        )
+        for r in event_rows + sector_rows
+    ]
+
+    frappe.db.delete("Event Readiness Snapshot", {
+        "snapshot_date": today,
+        "event": ["in", events]
+    })
+
+    if values:
+        frappe.db.bulk_insert("Event Readiness Snapshot", SNAPSHOT_FIELDS, values, chunk_size=500)
+
+    frappe.db.commit()
+
+    return len(events)
+
+
+def get_changed_events():
+    """
+    Events with task, ledger, sector-counter or header changes since the
+    last snapshot run, plus every event still running then. Task deletes
+    leave no task or ledger row, so running events are always taken.
+    """
+    since = frappe.db.sql("SELECT MAX(creation) FROM `tabEvent Readiness Snapshot`")[0][0]
+
+    if not since:
+        return frappe.get_all("Event Readiness", pluck="name")
+
+    return [r[0] for r in frappe.db.sql("""
+        SELECT event FROM `tabEvent Task`
+        WHERE modified > %(since)s AND IFNULL(event, '') != ''
+        UNION
+        SELECT event FROM `tabEvent Task Transition`
+        WHERE transitioned_on > %(since)s AND IFNULL(event, '') != ''
+        UNION
+        SELECT event FROM `tabEvent Sector`
+        WHERE modified > %(since)s
+        UNION
+        SELECT name FROM `tabEvent Readiness`
+        WHERE modified > %(since)s
+            OR IFNULL(custom_event_end_date, event_date) >= DATE(%(since)s)
+    """, {"since": since})]
+
+
+def on_event_readiness_trash(doc, method=None):
+    frappe.db.delete("Event Readiness Snapshot", {"event": doc.name})
+
+
+def on_sector_trash(doc, method=None):
+    # history of a removed sector must not block deleting it
+    frappe.db.delete("Event Readiness Snapshot", {"sector": doc.name})
+
+
+# -------------------------
+# Series endpoint
+# -------------------------
+@frappe.whitelist()
+def get_readiness_series(events=None, from_date=None, to_date=None, sector=None, points=DEFAULT_SERIES_POINTS):
+    """
+    Downsampled readiness series for burndown charts.
+
+    events: optional JSON list (default: every event visible to the caller)
+    sector: optional sector (default: event-level totals)
+    points: max points per series (capped at MAX_SERIES_POINTS); each
+            point is the last snapshot at or before the end of its bucket
+            (values carry forward).
+
+    The range is capped at MAX_SERIES_DAYS, counted back from to_date.
+    """
+    if isinstance(events, str):
+        events = json.loads(events or "[]")
+
+    to_date = getdate(to_date or nowdate())
+    from_date = getdate(from_date or add_days(to_date, -DEFAULT_SERIES_DAYS))
+    if from_date > to_date:
+        frappe.throw("From Date cannot be after To Date")
+
+    from_date = max(from_date, getdate(add_days(to_date, -(MAX_SERIES_DAYS - 1))))
+    points = min(max(cint(points), 1), MAX_SERIES_POINTS)
+
+    # -------------------------
+    # 1️⃣ Conditions (sector + caller's visible events)
+    # -------------------------
+    values = {"from_date": from_date, "to_date": to_date, "sector": sector, "events": events}
+    conditions = ["s.sector = %(sector)s" if sector else "s.sector IS NULL"]
+
+    if events:
+        conditions.append("s.event IN %(events)s")
+
+    user = frappe.session.user
+    if not is_event_admin(user):
+        conditions.append("""s.event IN (
+            SELECT v.event FROM `tabEvent Visibility` v WHERE v.user = %(user)s
+        )""")
+        values["user"] = user
+
+    where = " AND ".join(conditions)
+
+    # -------------------------
+    # 2️⃣ One query: rows in range + each event's last row before it
+    # -------------------------
+    rows = frappe.db.sql(f"""
+        SELECT s.event, s.snapshot_date, s.readiness, s.total_tasks, s.completed_tasks
+        FROM `tabEvent Readiness Snapshot` s
+        WHERE {where}
+            AND s.snapshot_date BETWEEN %(from_date)s AND %(to_date)s
+
+        UNION ALL
+
+        SELECT s.event, s.snapshot_date, s.readiness, s.total_tasks, s.completed_tasks
+        FROM `tabEvent Readiness Snapshot` s
+        INNER JOIN (
+            SELECT s.event, MAX(s.snapshot_date) AS snapshot_date
+            FROM `tabEvent Readiness Snapshot` s
+            WHERE {where}
+                AND s.snapshot_date < %(from_date)s
+            GROUP BY s.event
+        ) p ON p.event = s.event AND p.snapshot_date = s.snapshot_date
+        WHERE {where}
+
+        ORDER BY event, snapshot_date
+    """, values, as_dict=True)
+
+    # -------------------------
+    # 3️⃣ Downsample into buckets
+    # -------------------------
+    days = date_diff(to_date, from_date) + 1
+    step = max(math.ceil(days / points), 1)
+    labels = [
+        getdate(add_days(from_date, min(start + step - 1, days - 1)))
+        for start in range(0, days, step)
+    ]
+
+    by_event = {}
+    for r in rows:
+        by_event.setdefault(r.event, []).append(r)
+
+    series = []
+    for event_name, event_rows in by_event.items():
+        readiness, completed, total = [], [], []
+        last = None
+        i = 0
+
+        for label in labels:
+            while i < len(event_rows) and getdate(event_rows[i].snapshot_date) <= label:
+                last = event_rows[i]
+                i += 1
+
+            readiness.append(cint(last.readiness) if last else None)
+            completed.append(cint(last.completed_tasks) if last else None)
+            total.append(cint(last.total_tasks) if last else None)
+
+        series.append({
+            "event": event_name,
+            "readiness": readiness,
+            "completed_tasks": completed,
+            "total_tasks": total,
+        })
+
+    return {
+        "labels": [str(d) for d in labels],
+        "bucket_days": step,
+        "series": series,
+    }
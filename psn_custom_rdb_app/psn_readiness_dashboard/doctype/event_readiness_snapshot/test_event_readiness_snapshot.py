@@ -0,0 +1,111 @@
+# Copyright (c) 2026, PSN and Contributors
+# See license.txt
+
+import json
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, nowdate
+
+from psn_custom_rdb_app.psn_readiness_dashboard.doctype.event_readiness.test_event_readiness import make_event
+from psn_custom_rdb_app.psn_readiness_dashboard.doctype.event_readiness_snapshot.event_readiness_snapshot import (
+	get_readiness_series,
+	take_readiness_snapshots,
+)
+from psn_custom_rdb_app.psn_readiness_dashboard.doctype.event_task.test_event_task import make_task
+from psn_custom_rdb_app.psn_readiness_dashboard.doctype.sector.test_sector import make_sector
+
+
+def make_snapshot(event, snapshot_date, readiness, sector=None):
+	return frappe.get_doc({
+		"doctype": "Event Readiness Snapshot",
+		"snapshot_date": snapshot_date,
+		"event": event,
+		"sector": sector,
+		"readiness": readiness,
+		"total_tasks": 10,
+		"completed_tasks": readiness // 10,
+	}).insert(ignore_permissions=True)
+
+
+class TestEventReadinessSnapshot(FrappeTestCase):
+	"""
+	Counters and snapshots are written at commit time, so each step
+	commits; records are removed again in tearDown.
+	"""
+
+	def setUp(self):
+		self.event = make_event()
+		self.sector = make_sector()
+		frappe.db.commit()
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+		for task in frappe.get_all("Event Task", filters={"event": self.event.name}, pluck="name"):
+			frappe.delete_doc("Event Task", task, ignore_permissions=True, force=True)
+		frappe.db.commit()
+
+		frappe.delete_doc("Event Readiness", self.event.name, ignore_permissions=True, force=True)
+		if frappe.db.exists("Sector", self.sector.name):
+			frappe.delete_doc("Sector", self.sector.name, ignore_permissions=True, force=True)
+		frappe.db.commit()
+
+	def get_snapshots(self):
+		return {
+			r.sector: (r.readiness, r.completed_tasks, r.total_tasks)
+			for r in frappe.get_all(
+				"Event Readiness Snapshot",
+				filters={"event": self.event.name, "snapshot_date": nowdate()},
+				fields=["sector", "readiness", "completed_tasks", "total_tasks"],
+			)
+		}
+
+	def test_same_day_snapshot_replaces_rows(self):
+		task = make_task(self.event.name, self.sector.name)
+		make_task(self.event.name, self.sector.name)
+		frappe.db.commit()
+
+		take_readiness_snapshots()
+		self.assertEqual(self.get_snapshots(), {None: (0, 0, 2), self.sector.name: (0, 0, 2)})
+
+		task.reload()
+		task.status = "Completed"
+		task.save(ignore_permissions=True)
+		frappe.db.commit()
+
+		take_readiness_snapshots()
+		self.assertEqual(self.get_snapshots(), {None: (50, 1, 2), self.sector.name: (50, 1, 2)})
+		self.assertEqual(
+			frappe.db.count("Event Readiness Snapshot", {"event": self.event.name, "snapshot_date": nowdate()}),
+			2,
+		)
+
+	def test_series_carries_values_forward(self):
+		from_date = add_days(nowdate(), -3)
+		make_snapshot(self.event.name, add_days(from_date, -2), 10)
+		make_snapshot(self.event.name, add_days(from_date, 2), 40)
+		frappe.db.commit()
+
+		result = get_readiness_series(
+			events=json.dumps([self.event.name]), from_date=from_date, to_date=nowdate(), points=4
+		)
+
+		self.assertEqual(result["bucket_days"], 1)
+		self.assertEqual(len(result["labels"]), 4)
+		self.assertEqual(result["series"], [{
+			"event": self.event.name,
+			"readiness": [10, 10, 40, 40],
+			"completed_tasks": [1, 1, 4, 4],
+			"total_tasks": [10, 10, 10, 10],
+		}])
+
+	def test_sector_delete_removes_its_snapshots(self):
+		make_snapshot(self.event.name, nowdate(), 20, sector=self.sector.name)
+		make_snapshot(self.event.name, nowdate(), 20)
+		frappe.db.commit()
+
+		frappe.delete_doc("Sector", self.sector.name, ignore_permissions=True)
+		frappe.db.commit()
+
+		self.assertEqual(self.get_snapshots(), {None: (20, 2, 10)})
@@ -1,9 +1,21 @@
 # Copyright (c) 2025, PSN and contributors
 # For license information, please see license.txt
 
-# import frappe
+import frappe
 from frappe.model.document import Document
 
 
 class EventSector(Document):
 	pass
+
+
+# -------------------------
+# doc_events
+# -------------------------
+def on_event_readiness_trash(doc, method=None):
+	frappe.db.delete("Event Sector", {"event": doc.name})
+
+
+def on_sector_trash(doc, method=None):
+	# rows with live tasks are still protected by the Event Task link
+	frappe.db.delete("Event Sector", {"sector": doc.name})
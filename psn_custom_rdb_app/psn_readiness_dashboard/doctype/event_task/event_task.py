@@ -4,6 +4,8 @@
 import frappe
 from frappe.model.document import Document
 
+from psn_custom_rdb_app.psn_readiness_dashboard.access_scope import get_access_scope
+
 frappe.flags.ignore_csrf = True
 
 
@@ -13,34 +15,22 @@ class EventTask(Document):
 
 def get_permission_query_conditions(user, doctype=None):
     # --- 1️⃣ Super access ---
-    if user == "Administrator":
-        return None
-
-    roles = frappe.get_roles(user)
+    scope = get_access_scope(user)
 
-    if "Event Readiness Admin" in roles:
+    if scope.is_admin:
         return None
 
     # --- 2️⃣ Only apply to Event Task ---
     if doctype != "Event Task":
         return None
 
-    # --- 3️⃣ Fetch ALL sectors for user ---
-    kpis = frappe.get_all(
-        "User Sector KPI",
-        filters={"user": user},
-        fields=["sector", "custom_is_sector_lead"]
-    )
-
-    if not kpis:
+    # --- 3️⃣ ALL sectors for user (cached access scope) ---
+    if not scope.sectors:
         return "1=0"
 
-    sectors = [k.sector for k in kpis]
-    is_lead = any(k.custom_is_sector_lead for k in kpis)
-
     # --- 4️⃣ Sector Lead ---
-    if is_lead:
-        sectors_sql = ", ".join(frappe.db.escape(s) for s in sectors)
+    if scope.is_lead:
+        sectors_sql = ", ".join(frappe.db.escape(s) for s in scope.sectors)
         return f"`tabEvent Task`.`sector` IN ({sectors_sql})"
 
     # --- 5️⃣ Sector Member ---
@@ -1,9 +1,21 @@
 # Copyright (c) 2025, PSN and Contributors
 # See license.txt
 
-# import frappe
+import frappe
 from frappe.tests.utils import FrappeTestCase
 
 
+def make_task(event, sector, status="Pending", incharge=None, **kwargs):
+	return frappe.get_doc({
+		"doctype": "Event Task",
+		"event": event,
+		"sector": sector,
+		"l2_task_name": f"_Test Task {frappe.generate_hash(length=8)}",
+		"status": status,
+		"incharge": incharge,
+		**kwargs
+	}).insert(ignore_permissions=True)
+
+
 class TestEventTask(FrappeTestCase):
 	pass
@@ -0,0 +1,8 @@
+// Copyright (c) 2026, PSN and contributors
+// For license information, please see license.txt
+
+// frappe.ui.form.on("Event Task Transition", {
+// 	refresh(frm) {
+
+// 	},
+// });
@@ -0,0 +1,173 @@
+# Copyright (c) 2026, PSN and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import flt, now
+
+from psn_custom_rdb_app.psn_readiness_dashboard.access_scope import get_task_conditions
+from psn_custom_rdb_app.psn_readiness_dashboard.db_indexes import ensure_app_indexes
+
+TRANSITION_FIELDS = [
+    "name", "creation", "modified", "owner", "modified_by", "docstatus", "idx",
+    "task", "event", "sector", "incharge", "from_status", "to_status", "transitioned_on"
+]
+
+
+class EventTaskTransition(Document):
+    pass
+
+
+def on_doctype_update():
+    ensure_app_indexes("Event Task Transition")
+
+
+def log_transitions(transitions):
+    """
+    Append rows to the transition ledger in one multi-row insert.
+
+    transitions: iterable of dicts with task, event, sector, incharge,
+    from_status, to_status and optionally transitioned_on.
+    """
+    now_ts = now()
+    user = frappe.session.user
+
+    values = [
+        (
+            frappe.generate_hash(length=12), now_ts, now_ts, user, user, 0, 0,
+            t["task"], t.get("event"), t.get("sector"), t.get("incharge"),
+            t.get("from_status"), t.get("to_status"), t.get("transitioned_on") or now_ts
+        )
+        for t in transitions
+    ]
+
+    if values:
+        frappe.db.bulk_insert("Event Task Transition", TRANSITION_FIELDS, values, chunk_size=500)
+
+
+def log_task_transition(task, from_status=None):
+    log_transitions([{
+        "task": task.name,
+        "event": task.event,
+        "sector": task.sector,
+        "incharge": task.incharge,
+        "from_status": from_status,
+        "to_status": task.status,
+    }])
+
+
+# -------------------------
+# Ledger queries
+# -------------------------
+def _ledger_conditions(user=None, sector=None, from_date=None, to_date=None, alias="t."):
+    conditions = [f"{alias}incharge IS NOT NULL"]
+    if user:
+        conditions.append(f"{alias}incharge = %(user)s")
+    if sector:
+        conditions.append(f"{alias}sector = %(sector)s")
+    if from_date:
+        conditions.append(f"{alias}transitioned_on >= %(from_date)s")
+    if to_date:
+        conditions.append(f"{alias}transitioned_on < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)")
+    return " AND ".join(conditions)
+
+
+def get_response_hours(user=None, sector=None, from_date=None, to_date=None):
+    """
+    Average hours from task creation to its first status change,
+    per (incharge, sector).
+    """
+    values = {"user": user, "sector": sector, "from_date": from_date, "to_date": to_date}
+
+    rows = frappe.db.sql(f"""
+        SELECT
+            f.incharge AS user,
+            f.sector,
+            AVG(TIMESTAMPDIFF(SECOND, et.creation, f.first_change)) / 3600 AS avg_hours
+        FROM (
+            SELECT t.task, t.incharge, t.sector, MIN(t.transitioned_on) AS first_change
+            FROM `tabEvent Task Transition` t
+            WHERE {_ledger_conditions(user, sector, from_date, to_date)}
+                AND t.from_status IS NOT NULL
+            GROUP BY t.task, t.incharge, t.sector
+        ) f
+        INNER JOIN `tabEvent Task` et ON et.name = f.task
+        GROUP BY f.incharge, f.sector
+    """, values, as_dict=True)
+
+    return {
+        (r.user, r.sector): round(flt(r.avg_hours), 2)
+        for r in rows
+        if r.avg_hours is not None
+    }
+
+
+def get_completion_stats(user=None, sector=None, from_date=None, to_date=None):
+    """
+    Per (incharge, sector) completion stats from the ledger:
+      - completed: tasks whose latest transition is to Completed
+      - on_time: of those, completed on or before the due date
+      - avg_cycle_hrs: average hours from task creation to completion
+    """
+    values = {"user": user, "sector": sector, "from_date": from_date, "to_date": to_date}
+
+    rows = frappe.db.sql(f"""
+        SELECT
+            c.incharge AS user,
+            c.sector,
+            COUNT(*) AS completed,
+            SUM(CASE
+                WHEN et.due_date IS NOT NULL AND DATE(c.completed_on) <= et.due_date
+                THEN 1 ELSE 0 END) AS on_time,
+            AVG(TIMESTAMPDIFF(SECOND, et.creation, c.completed_on)) / 3600 AS avg_cycle_hrs
+        FROM (
+            SELECT t.task, t.incharge, t.sector, MAX(t.transitioned_on) AS completed_on
+            FROM `tabEvent Task Transition` t
+            WHERE {_ledger_conditions(user, sector, from_date, to_date)}
+                AND t.to_status = 'Completed'
+            GROUP BY t.task, t.incharge, t.sector
+        ) c
+        INNER JOIN `tabEvent Task` et ON et.name = c.task AND et.status = 'Completed'
+        GROUP BY c.incharge, c.sector
+    """, values, as_dict=True)
+
+    return {(r.user, r.sector): r for r in rows}
+
+
+@frappe.whitelist()
+def get_cycle_time_stats(event=None, sector=None, from_date=None, to_date=None):
+    """
+    Average creation → completion hours per sector, from the ledger.
+    Limited to the tasks the caller may see (same scope as the task lists).
+    """
+    conditions = ["t.to_status = 'Completed'"]
+    if event:
+        conditions.append("t.event = %(event)s")
+    if sector:
+        conditions.append("t.sector = %(sector)s")
+    if from_date:
+        conditions.append("t.transitioned_on >= %(from_date)s")
+    if to_date:
+        conditions.append("t.transitioned_on < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)")
+
+    return frappe.db.sql(f"""
+        SELECT
+            c.sector,
+            COUNT(*) AS completed_tasks,
+            ROUND(AVG(TIMESTAMPDIFF(SECOND, et.creation, c.completed_on)) / 3600, 2) AS avg_cycle_hrs
+        FROM (
+            SELECT t.task, t.sector, MAX(t.transitioned_on) AS completed_on
+            FROM `tabEvent Task Transition` t
+            WHERE {" AND ".join(conditions)}
+            GROUP BY t.task, t.sector
+        ) c
+        INNER JOIN `tabEvent Task` et ON et.name = c.task
+        WHERE {get_task_conditions(alias="et")}
+        GROUP BY c.sector
+        ORDER BY c.sector
+    """, {
+        "event": event,
+        "sector": sector,
+        "from_date": from_date,
+        "to_date": to_date
+    }, as_dict=True)
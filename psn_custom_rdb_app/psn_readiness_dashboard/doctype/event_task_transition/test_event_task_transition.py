@@ -0,0 +1,46 @@
+# Copyright (c) 2026, PSN and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from psn_custom_rdb_app.psn_readiness_dashboard.doctype.event_readiness.test_event_readiness import make_event
+from psn_custom_rdb_app.psn_readiness_dashboard.doctype.event_task.test_event_task import make_task
+from psn_custom_rdb_app.psn_readiness_dashboard.doctype.sector.test_sector import make_sector
+
+
+class TestEventTaskTransition(FrappeTestCase):
+	def test_status_change_is_logged(self):
+		task = make_task(make_event().name, make_sector().name)
+
+		task.status = "Completed"
+		task.save(ignore_permissions=True)
+
+		transitions = frappe.get_all(
+			"Event Task Transition",
+			filters={"task": task.name},
+			fields=["from_status", "to_status"],
+		)
+		self.assertCountEqual([(t.from_status, t.to_status) for t in transitions], [
+			(None, "Pending"),
+			("Pending", "Completed"),
+		])
+
+	def test_ledger_does_not_block_deletes(self):
+		event = make_event()
+		sector = make_sector()
+		task = make_task(event.name, sector.name)
+
+		task.status = "In Progress"
+		task.save(ignore_permissions=True)
+
+		task.delete(ignore_permissions=True)
+		self.assertFalse(frappe.db.exists("Event Task", task.name))
+
+		# ledger rows outlive their task, event and sector
+		self.assertTrue(frappe.db.exists("Event Task Transition", {"task": task.name}))
+
+		event.delete(ignore_permissions=True)
+		sector.delete(ignore_permissions=True)
+		self.assertFalse(frappe.db.exists("Event Readiness", event.name))
+		self.assertFalse(frappe.db.exists("Sector", sector.name))
@@ -0,0 +1,166 @@
+# Copyright (c) 2026, PSN and contributors
+# For license information, please see license.txt
+
+import hashlib
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import now
+
+from psn_custom_rdb_app.psn_readiness_dashboard.db_indexes import ensure_app_indexes
+
+VISIBILITY_FIELDS = [
+    "name", "creation", "modified", "owner", "modified_by", "docstatus", "idx",
+    "user", "event", "via_sector", "via_incharge"
+]
+
+
+class EventVisibility(Document):
+    pass
+
+
+def on_doctype_update():
+    ensure_app_indexes("Event Visibility")
+
+
+def get_visibility_name(user, event_name):
+    # one row per (user, event) → deterministic primary key
+    return hashlib.md5(f"{user}::{event_name}".encode()).hexdigest()
+
+
+# -------------------------
+# Rebuild
+# -------------------------
+def rebuild_event_visibility(events):
+    """Rebuild every visibility row of the given events."""
+    events = sorted({e for e in events if e})
+    if not events:
+        return
+
+    rows = frappe.db.sql("""
+        SELECT k.user, t.event, 1 AS via_sector, 0 AS via_incharge
+        FROM (
+            SELECT DISTINCT event, sector
+            FROM `tabEvent Task`
+            WHERE event IN %(events)s
+        ) t
+        INNER JOIN `tabUser Sector KPI` k ON k.sector = t.sector
+
+        UNION ALL
+
+        SELECT DISTINCT incharge, event, 0, 1
+        FROM `tabEvent Task`
+        WHERE event IN %(events)s AND IFNULL(incharge, '') != ''
+    """, {"events": events}, as_dict=True)
+
+    frappe.db.delete("Event Visibility", {"event": ["in", events]})
+    _insert_visibility(rows)
+
+
+def rebuild_user_visibility(users):
+    """Rebuild every visibility row of the given users."""
+    users = sorted({u for u in users if u})
+    if not users:
+        return
+
+    rows = frappe.db.sql("""
+        SELECT DISTINCT k.user, t.event, 1 AS via_sector, 0 AS via_incharge
+        FROM `tabUser Sector KPI` k
+        INNER JOIN `tabEvent Task` t ON t.sector = k.sector
+        WHERE k.user IN %(users)s AND IFNULL(t.event, '') != ''
+
+        UNION ALL
+
+        SELECT DISTINCT incharge, event, 0, 1
+        FROM `tabEvent Task`
+        WHERE incharge IN %(users)s AND IFNULL(event, '') != ''
+    """, {"users": users}, as_dict=True)
+
+    frappe.db.delete("Event Visibility", {"user": ["in", users]})
+    _insert_visibility(rows)
+
+
+def rebuild_all_visibility():
+    frappe.db.delete("Event Visibility")
+    rebuild_event_visibility(frappe.get_all("Event Readiness", pluck="name"))
+
+
+def _insert_visibility(rows):
+    merged = {}
+    for r in rows:
+        flags = merged.setdefault((r.user, r.event), [0, 0])
+        flags[0] |= r.via_sector
+        flags[1] |= r.via_incharge
+
+    now_ts = now()
+    owner = frappe.session.user
+
+    values = [
+        (
+            get_visibility_name(user, event_name), now_ts, now_ts, owner, owner, 0, 0,
+            user, event_name, via_sector, via_incharge
+        )
+        for (user, event_name), (via_sector, via_incharge) in merged.items()
+    ]
+
+    if values:
+        frappe.db.bulk_insert("Event Visibility", VISIBILITY_FIELDS, values, chunk_size=500)
+
+
+# -------------------------
+# Per-transaction rebuild queue
+# -------------------------
+def queue_visibility_rebuild(events=(), users=()):
+    pending = getattr(frappe.local, "psn_visibility_rebuild", None)
+
+    if pending is None:
+        pending = frappe.local.psn_visibility_rebuild = {"events": set(), "users": set()}
+        frappe.db.before_commit.add(flush_visibility_rebuild)
+        frappe.db.after_rollback.add(discard_visibility_rebuild)
+
+    pending["events"].update(e for e in events if e)
+    pending["users"].update(u for u in users if u)
+
+
+def flush_visibility_rebuild():
+    pending = getattr(frappe.local, "psn_visibility_rebuild", None)
+    frappe.local.psn_visibility_rebuild = None
+
+    if not pending:
+        return
+
+    rebuild_event_visibility(pending["events"])
+    rebuild_user_visibility(pending["users"])
+
+
+def discard_visibility_rebuild():
+    frappe.local.psn_visibility_rebuild = None
+
+
+# -------------------------
+# doc_events
+# -------------------------
+def on_event_task_change(doc, method=None):
+    previous = doc.get_doc_before_save()
+
+    if method == "on_trash" or not previous:
+        queue_visibility_rebuild(events=[doc.event])
+        return
+
+    if (previous.event, previous.sector, previous.incharge) != (doc.event, doc.sector, doc.incharge):
+        queue_visibility_rebuild(events=[previous.event, doc.event])
+
+
+def on_user_sector_kpi_change(doc, method=None):
+    previous = doc.get_doc_before_save()
+
+    if method == "on_trash" or not previous:
+        queue_visibility_rebuild(users=[doc.user])
+        return
+
+    if (previous.user, previous.sector) != (doc.user, doc.sector):
+        queue_visibility_rebuild(users=[previous.user, doc.user])
+
+
+def on_event_readiness_trash(doc, method=None):
+    frappe.db.delete("Event Visibility", {"event": doc.name})
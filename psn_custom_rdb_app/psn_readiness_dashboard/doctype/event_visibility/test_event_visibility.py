@@ -0,0 +1,106 @@
+# Copyright (c) 2026, PSN and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from psn_custom_rdb_app.psn_readiness_dashboard.doctype.event_readiness.test_event_readiness import make_event
+from psn_custom_rdb_app.psn_readiness_dashboard.doctype.event_task.test_event_task import make_task
+from psn_custom_rdb_app.psn_readiness_dashboard.doctype.sector.test_sector import make_sector
+
+
+def make_user(email=None):
+	email = email or f"_test_{frappe.generate_hash(length=8)}@example.com"
+
+	if frappe.db.exists("User", email):
+		return frappe.get_doc("User", email)
+
+	return frappe.get_doc({
+		"doctype": "User",
+		"email": email,
+		"first_name": "_Test",
+		"send_welcome_email": 0,
+	}).insert(ignore_permissions=True)
+
+
+def make_kpi(user, sector):
+	return frappe.get_doc({
+		"doctype": "User Sector KPI",
+		"user": user,
+		"sector": sector,
+	}).insert(ignore_permissions=True)
+
+
+class TestEventVisibility(FrappeTestCase):
+	"""
+	Visibility rows are rebuilt at commit time, so each step commits;
+	records are removed again in tearDown.
+	"""
+
+	def setUp(self):
+		self.event = make_event()
+		self.sector = make_sector()
+		self.other_sector = make_sector()
+		self.users = [make_user() for _ in range(4)]
+		frappe.db.commit()
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+		for task in frappe.get_all("Event Task", filters={"event": self.event.name}, pluck="name"):
+			frappe.delete_doc("Event Task", task, ignore_permissions=True, force=True)
+		for kpi in frappe.get_all("User Sector KPI", filters={"user": ["in", [u.name for u in self.users]]}, pluck="name"):
+			frappe.delete_doc("User Sector KPI", kpi, ignore_permissions=True, force=True)
+		frappe.db.commit()
+
+		frappe.delete_doc("Event Readiness", self.event.name, ignore_permissions=True, force=True)
+		for sector in (self.sector, self.other_sector):
+			frappe.delete_doc("Sector", sector.name, ignore_permissions=True, force=True)
+		for user in self.users:
+			frappe.delete_doc("User", user.name, ignore_permissions=True, force=True)
+		frappe.db.commit()
+
+	def get_visibility(self):
+		return {
+			r.user: (r.via_sector, r.via_incharge)
+			for r in frappe.get_all(
+				"Event Visibility",
+				filters={"event": self.event.name},
+				fields=["user", "via_sector", "via_incharge"],
+			)
+		}
+
+	def test_task_sector_and_incharge_change(self):
+		member, other_member, incharge, other_incharge = (u.name for u in self.users)
+		make_kpi(member, self.sector.name)
+		make_kpi(other_member, self.other_sector.name)
+
+		task = make_task(self.event.name, self.sector.name, incharge=incharge)
+		frappe.db.commit()
+		self.assertEqual(self.get_visibility(), {member: (1, 0), incharge: (0, 1)})
+
+		task.reload()
+		task.sector = self.other_sector.name
+		task.incharge = other_incharge
+		task.save(ignore_permissions=True)
+		frappe.db.commit()
+		self.assertEqual(self.get_visibility(), {other_member: (1, 0), other_incharge: (0, 1)})
+
+	def test_member_and_incharge_flags_merge(self):
+		member = self.users[0].name
+		make_kpi(member, self.sector.name)
+
+		make_task(self.event.name, self.sector.name, incharge=member)
+		frappe.db.commit()
+		self.assertEqual(self.get_visibility(), {member: (1, 1)})
+
+	def test_kpi_insert(self):
+		member = self.users[0].name
+
+		make_task(self.event.name, self.sector.name)
+		frappe.db.commit()
+		self.assertEqual(self.get_visibility(), {})
+
+		make_kpi(member, self.sector.name)
+		frappe.db.commit()
+		self.assertEqual(self.get_visibility(), {member: (1, 0)})
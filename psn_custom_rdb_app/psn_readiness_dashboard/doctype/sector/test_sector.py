@@ -1,9 +1,18 @@
 # Copyright (c) 2025, PSN and Contributors
 # See license.txt
 
-# import frappe
+import frappe
 from frappe.tests.utils import FrappeTestCase
 
 
+def make_sector(sector_name=None):
+	sector_name = sector_name or f"_Test Sector {frappe.generate_hash(length=8)}"
+
+	if frappe.db.exists("Sector", sector_name):
+		return frappe.get_doc("Sector", sector_name)
+
+	return frappe.get_doc({"doctype": "Sector", "sector_name": sector_name}).insert(ignore_permissions=True)
+
+
 class TestSector(FrappeTestCase):
 	pass
@@ -3,8 +3,19 @@
 
 import frappe
 from frappe.model.document import Document
+from frappe.utils import cint, flt, now
 from frappe.utils.background_jobs import enqueue
 
+from psn_custom_rdb_app.psn_readiness_dashboard.access_scope import clear_access_scope_cache
+from psn_custom_rdb_app.psn_readiness_dashboard.doctype.event_task_transition.event_task_transition import (
+    get_completion_stats,
+    get_response_hours,
+)
+from psn_custom_rdb_app.psn_readiness_dashboard.doctype.event_visibility.event_visibility import (
+    rebuild_user_visibility,
+)
+from psn_custom_rdb_app.psn_readiness_dashboard.response_cache import bump_data_version
+
 frappe.flags.ignore_csrf = True
 
 
@@ -12,120 +23,157 @@ class UserSectorKPI(Document):
     pass
 
 
+KPI_SYNC_FIELDS = [
+    "name", "creation", "modified", "owner", "modified_by", "docstatus", "idx",
+    "user", "sector", "custom_is_sector_lead",
+    "total_tasks", "completed_tasks", "pending_tasks", "delayed_tasks", "in_progress_tasks"
+]
+
+
 @frappe.whitelist()
 def sync_user_sector_kpi():
     """Ensure every sector member has a corresponding KPI entry."""
-    created = 0
-    skipped = 0
-
-    sectors = frappe.get_all("Sector", fields=["name"])
+    result = sync_kpi_memberships()
+    frappe.db.commit()
 
-    for sec in sectors:
-        members = frappe.get_all(
-            "Sector Member",
-            filters={"parent": sec["name"]},
-            fields=["user", "is_sector_lead"]
+    return {
+        "status": "success",
+        **result,
+        "message": (
+            f"KPI Sync Completed: {result['created']} added, {result['updated']} lead flags fixed, "
+            f"{result['skipped']} already existed, {len(result['orphans'])} orphaned"
         )
+    }
+
+
+def sync_kpi_memberships(users=None):
+    """
+    Reconcile User Sector KPI rows with Sector membership using two set
+    queries:
+      - missing  → member without a KPI row → bulk-inserted
+      - stale    → custom_is_sector_lead drifted from the membership → bulk-updated
+      - orphaned → KPI row without a membership → reported, not deleted
+
+    users: optionally limit the sync to these users.
+    Runs in the caller's transaction; no commit here.
+    """
+    if isinstance(users, str):
+        users = [users]
+    users = list(users) if users else None
+
+    user_condition = "AND m.user IN %(users)s" if users else ""
+    kpi_condition = "WHERE k.user IN %(users)s" if users else ""
+
+    # -------------------------
+    # 1️⃣ Two set queries
+    # -------------------------
+    memberships = {
+        (r.user, r.sector): cint(r.is_lead)
+        for r in frappe.db.sql(f"""
+            SELECT m.user, m.parent AS sector, MAX(IFNULL(m.is_sector_lead, 0)) AS is_lead
+            FROM `tabSector Member` m
+            WHERE m.parenttype = 'Sector'
+                AND IFNULL(m.user, '') != ''
+                {user_condition}
+            GROUP BY m.user, m.parent
+        """, {"users": users}, as_dict=True)
+    }
 
-        for m in members:
-            exists = frappe.db.exists(
-                "User Sector KPI",
-                {"user": m["user"], "sector": sec["name"]}
-            )
+    kpis = {
+        (r.user, r.sector): r
+        for r in frappe.db.sql(f"""
+            SELECT k.name, k.user, k.sector, k.custom_is_sector_lead
+            FROM `tabUser Sector KPI` k
+            {kpi_condition}
+        """, {"users": users}, as_dict=True)
+    }
 
-            if exists:
-                skipped += 1
-                continue
+    missing = memberships.keys() - kpis.keys()
+    orphans = kpis.keys() - memberships.keys()
+    stale_keys = [
+        key for key, is_lead in memberships.items()
+        if key in kpis and cint(kpis[key].custom_is_sector_lead) != is_lead
+    ]
+    stale = {kpis[key].name: {"custom_is_sector_lead": memberships[key]} for key in stale_keys}
+
+    # -------------------------
+    # 2️⃣ Batched writes
+    # -------------------------
+    now_ts = now()
+    owner = frappe.session.user
+
+    values = [
+        (
+            f"{user}-{sector}", now_ts, now_ts, owner, owner, 0, 0,
+            user, sector, memberships[(user, sector)],
+            0, 0, 0, 0, 0
+        )
+        for user, sector in sorted(missing)
+    ]
 
-            doc = frappe.new_doc("User Sector KPI")
-            doc.user = m["user"]
-            doc.sector = sec["name"]
-            doc.custom_is_sector_lead = m["is_sector_lead"]
-            doc.insert(ignore_permissions=True)
+    if values:
+        frappe.db.bulk_insert("User Sector KPI", KPI_SYNC_FIELDS, values, chunk_size=500)
+    if stale:
+        frappe.db.bulk_update("User Sector KPI", stale, chunk_size=500)
 
-            created += 1
+    # -------------------------
+    # 3️⃣ Bulk writes skip doc_events → refresh what they maintain
+    # -------------------------
+    changed_users = {user for user, _ in missing} | {user for user, _ in stale_keys}
 
-    frappe.db.commit()
+    if changed_users:
+        for user in changed_users:
+            clear_access_scope_cache(user)
+        rebuild_user_visibility(changed_users)
+        bump_data_version("kpis")
 
     return {
-        "status": "success",
-        "created": created,
-        "skipped": skipped,
-        "message": f"KPI Sync Completed: {created} added, {skipped} already existed"
+        "created": len(values),
+        "updated": len(stale),
+        "skipped": len(memberships) - len(values),
+        "orphans": [
+            {"name": kpis[key].name, "user": key[0], "sector": key[1]}
+            for key in sorted(orphans)
+        ],
     }
 
 
 def get_avg_response_time_hours(user, sector):
-    tasks = frappe.get_all(
-        "Event Task",
-        filters={"sector": sector, "incharge": user},
-        fields=["name", "creation"]
-    )
-
-    total_hours = 0
-    count = 0
-
-    for t in tasks:
-        first_update = frappe.get_value(
-            "Version",
-            {
-                "ref_doctype": "Event Task",
-                "docname": t.name
-            },
-            "creation",
-            order_by="creation asc"
-        )
-
-        if first_update:
-            diff = (first_update - t.creation).total_seconds() / 3600
-            total_hours += diff
-            count += 1
-
-    if count == 0:
-        return None
-
-    return round(total_hours / count, 2)
+    return get_response_hours(user=user, sector=sector).get((user, sector))
 
 
 def get_on_time_percentage(user, sector):
-    completed_tasks = frappe.get_all(
-        "Event Task",
-        filters={
-            "sector": sector,
-            "incharge": user,
-            "status": "Completed"
-        },
-        fields=["name", "due_date", "modified"]
-    )
+    stats = get_completion_stats(user=user, sector=sector).get((user, sector))
 
-    if not completed_tasks:
+    if not stats or not stats.completed:
         return None
 
-    on_time = 0
+    return round((cint(stats.on_time) / stats.completed) * 100, 2)
 
-    for t in completed_tasks:
-        if t.due_date and t.modified.date() <= t.due_date:
-            on_time += 1
 
-    return round((on_time / len(completed_tasks)) * 100, 2)
+def compute_base_score(completed, delayed, pending, in_progress):
+    total = completed + delayed + in_progress + pending
 
+    if total == 0:
+        return 0
 
-def calculate_time_weighted_kpi(user, sector):
-    (
-        base_score,
-        completed,
-        delayed,
-        pending,
-        in_progress,
-        total
-    ) = calculate_score_for_user_sector(user, sector)
+    # Weighted raw score
+    raw_score = (
+        (completed * 1.0)
+        - (delayed * 1.5)
+        - (pending * 0.25)
+    )
 
-    avg_response = get_avg_response_time_hours(user, sector)
-    on_time_pct = get_on_time_percentage(user, sector)
+    # Normalize to 0–100
+    return max(0, round((raw_score / total) * 100, 2))
 
+
+def compute_weighted_kpi(base_score, avg_response, on_time_pct):
     # Normalize response time (ideal = 4 hrs)
     if avg_response is None:
         response_score = 50
+    elif avg_response <= 0:
+        response_score = 100
     else:
         response_score = max(0, min(100, (4 / avg_response) * 100))
 
@@ -133,15 +181,29 @@ def calculate_time_weighted_kpi(user, sector):
     delivery_score = on_time_pct if on_time_pct is not None else 50
 
     # Final weighted KPI
-    final_score = round(
+    return round(
         (base_score * 0.5) +
         (delivery_score * 0.3) +
         (response_score * 0.2),
         2
     )
 
+
+def calculate_time_weighted_kpi(user, sector):
+    (
+        base_score,
+        completed,
+        delayed,
+        pending,
+        in_progress,
+        total
+    ) = calculate_score_for_user_sector(user, sector)
+
+    avg_response = get_avg_response_time_hours(user, sector)
+    on_time_pct = get_on_time_percentage(user, sector)
+
     return {
-        "kpi_score": final_score,
+        "kpi_score": compute_weighted_kpi(base_score, avg_response, on_time_pct),
         "avg_response_hrs": avg_response,
         "on_time_percentage": on_time_pct,
         "completed": completed,
@@ -153,37 +215,23 @@ def calculate_time_weighted_kpi(user, sector):
 
 
 def calculate_score_for_user_sector(user, sector):
-    completed = frappe.db.count(
-        "Event Task",
-        {"sector": sector, "incharge": user, "status": "Completed"}
-    )
-    delayed = frappe.db.count(
-        "Event Task",
-        {"sector": sector, "incharge": user, "status": "Delayed"}
-    )
-    in_progress = frappe.db.count(
-        "Event Task",
-        {"sector": sector, "incharge": user, "status": "In Progress"}
-    )
-    pending = frappe.db.count(
-        "Event Task",
-        {"sector": sector, "incharge": user, "status": "Pending"}
-    )
+    counts = frappe.db.sql("""
+        SELECT
+            SUM(CASE WHEN status = 'Completed' THEN 1 ELSE 0 END) AS completed,
+            SUM(CASE WHEN status = 'Delayed' THEN 1 ELSE 0 END) AS delayed,
+            SUM(CASE WHEN status = 'In Progress' THEN 1 ELSE 0 END) AS in_progress,
+            SUM(CASE WHEN status = 'Pending' THEN 1 ELSE 0 END) AS pending
+        FROM `tabEvent Task`
+        WHERE sector = %s AND incharge = %s
+    """, (sector, user), as_dict=True)[0]
+
+    completed = cint(counts.completed)
+    delayed = cint(counts.delayed)
+    in_progress = cint(counts.in_progress)
+    pending = cint(counts.pending)
 
     total = completed + delayed + in_progress + pending
-
-    if total == 0:
-        return 0, completed, delayed, pending, in_progress, total
-
-    # Weighted raw score
-    raw_score = (
-        (completed * 1.0)
-        - (delayed * 1.5)
-        - (pending * 0.25)
-    )
-
-    # Normalize to 0–100
-    score = max(0, round((raw_score / total) * 100, 2))
+    score = compute_base_score(completed, delayed, pending, in_progress)
 
     return score, completed, delayed, pending, in_progress, total
 
@@ -202,74 +250,104 @@ def recalculate_kpi_scores():
 
 
 def execute_kpi_recalculation():
+    recalculate_kpis()
+    frappe.db.commit()
+
+
+def recalculate_kpi_for_user_sector(user, sector):
+    recalculate_kpis(user=user, sector=sector)
+
+
+def recalculate_kpis(user=None, sector=None):
+    """
+    Set-based KPI recalculation.
+
+    Task counts come from one grouped query on Event Task; on-time rate,
+    response time and cycle time from grouped queries on the transition
+    ledger. All KPI rows are written back with one batched update.
+    Scoring matches calculate_time_weighted_kpi.
+    """
+    kpi_filters = {}
+    if user:
+        kpi_filters["user"] = user
+    if sector:
+        kpi_filters["sector"] = sector
+
     kpi_rows = frappe.get_all(
         "User Sector KPI",
+        filters=kpi_filters,
         fields=["name", "user", "sector"]
     )
 
+    if not kpi_rows:
+        return 0
+
+    task_stats = _get_task_stats(user, sector)
+    completion_stats = get_completion_stats(user=user, sector=sector)
+    response_hours = get_response_hours(user=user, sector=sector)
+    now_ts = now()
+
+    updates = {}
+
     for row in kpi_rows:
-        result = calculate_time_weighted_kpi(row.user, row.sector)
-
-        if result["avg_response_hrs"] is None:
-            print("avg was none")
-            avg_response_hrs = 0
-        else:
-            avg_response_hrs = result["avg_response_hrs"]
-
-        if result["on_time_percentage"] is None:
-            print("on time was none")
-            on_time_percentage = 0
-        else:
-            on_time_percentage = result["on_time_percentage"]
-
-        frappe.db.set_value(
-            "User Sector KPI",
-            row.name,
-            {
-                "kpi_score": result["kpi_score"],
-                "avg_response_hrs": avg_response_hrs,
-                "on_time_percentage": on_time_percentage,
-                "completed_tasks": result["completed"],
-                "delayed_tasks": result["delayed"],
-                "pending_tasks": result["pending"],
-                "in_progress_tasks": result["in_progress"],
-                "total_tasks": result["total"]
-            }
+        key = (row.user, row.sector)
+        stats = task_stats.get(key) or frappe._dict()
+        completion = completion_stats.get(key) or frappe._dict()
+
+        completed = cint(stats.completed)
+        delayed = cint(stats.delayed)
+        in_progress = cint(stats.in_progress)
+        pending = cint(stats.pending)
+        total = completed + delayed + in_progress + pending
+
+        on_time_pct = (
+            round((cint(completion.on_time) / completion.completed) * 100, 2)
+            if completion.completed else None
         )
+        avg_response = response_hours.get(key)
+
+        base_score = compute_base_score(completed, delayed, pending, in_progress)
+
+        updates[row.name] = {
+            "kpi_score": compute_weighted_kpi(base_score, avg_response, on_time_pct),
+            "avg_response_hrs": avg_response or 0,
+            "on_time_percentage": on_time_pct or 0,
+            "avg_cycle_time_hrs": round(flt(completion.avg_cycle_hrs), 2),
+            "completed_tasks": completed,
+            "delayed_tasks": delayed,
+            "pending_tasks": pending,
+            "in_progress_tasks": in_progress,
+            "total_tasks": total,
+            "last_updated_on": now_ts
+        }
 
-    frappe.db.commit()
+    frappe.db.bulk_update("User Sector KPI", updates, chunk_size=500)
+    bump_data_version("kpis")
 
+    return len(updates)
 
-def recalculate_kpi_for_user_sector(user, sector):
-    result = calculate_time_weighted_kpi(user, sector)
 
-    kpi_name = frappe.db.get_value(
-        "User Sector KPI",
-        {"user": user, "sector": sector},
-        "name"
-    )
+def _pair_conditions(user=None, sector=None):
+    conditions = ["incharge IS NOT NULL"]
+    if user:
+        conditions.append("incharge = %(user)s")
+    if sector:
+        conditions.append("sector = %(sector)s")
+    return " AND ".join(conditions)
 
-    if not kpi_name:
-        return
 
-    if not result.get("avg_response_hrs"):
-        print("avg was none")
-        avg_response_hrs = 0
-    if not result.get("on_time_percentage"):
-        print("on time was none")
-        on_time_percentage = 0
+def _get_task_stats(user=None, sector=None):
+    rows = frappe.db.sql(f"""
+        SELECT
+            incharge AS user,
+            sector,
+            SUM(CASE WHEN status = 'Completed' THEN 1 ELSE 0 END) AS completed,
+            SUM(CASE WHEN status = 'Delayed' THEN 1 ELSE 0 END) AS delayed,
+            SUM(CASE WHEN status = 'In Progress' THEN 1 ELSE 0 END) AS in_progress,
+            SUM(CASE WHEN status = 'Pending' THEN 1 ELSE 0 END) AS pending
+        FROM `tabEvent Task`
+        WHERE {_pair_conditions(user, sector)}
+        GROUP BY incharge, sector
+    """, {"user": user, "sector": sector}, as_dict=True)
 
-    frappe.db.set_value(
-        "User Sector KPI",
-        kpi_name,
-        {
-            "kpi_score": result["kpi_score"],
-            "avg_response_hrs": avg_response_hrs,
-            "on_time_percentage": on_time_percentage,
-            "completed_tasks": result["completed"],
-            "delayed_tasks": result["delayed"],
-            "pending_tasks": result["pending"],
-            "in_progress_tasks": result["in_progress"],
-            "total_tasks": result["total"]
-        }
-    )
+    return {(r.user, r.sector): r for r in rows}
@@ -0,0 +1,514 @@
+import frappe
+from frappe.utils import cint, flt, now
+
+from psn_custom_rdb_app.psn_readiness_dashboard.realtime_deltas import queue_realtime_delta
+from psn_custom_rdb_app.psn_readiness_dashboard.response_cache import bump_data_version
+
+# Event Task status → Event Readiness counter column
+STATUS_COUNTER_FIELDS = {
+    "Pending": "pending_tasks",
+    "In Progress": "custom_in_progress_tasks",
+    "Completed": "completed_tasks",
+    "Delayed": "delayed_tasks",
+}
+
+COUNTER_FIELDS = ["total_tasks", *STATUS_COUNTER_FIELDS.values()]
+
+# Event Task status → Sector counter column
+SECTOR_STATUS_FIELDS = {
+    "In Progress": "in_progress_tasks",
+    "Completed": "completed_tasks",
+}
+
+SECTOR_COUNTER_FIELDS = ["total_tasks", *SECTOR_STATUS_FIELDS.values()]
+
+# Event Task status → Event Sector counter column
+EVENT_SECTOR_STATUS_FIELDS = {
+    "Pending": "pending_tasks",
+    "In Progress": "in_progress_tasks",
+    "Completed": "completed_tasks",
+    "Delayed": "delayed_tasks",
+}
+
+EVENT_SECTOR_COUNTER_FIELDS = ["total_tasks", *EVENT_SECTOR_STATUS_FIELDS.values()]
+
+# Counter target → (task fields identifying the row, status → column map)
+COUNTER_TARGETS = {
+    "Event Readiness": (("event",), STATUS_COUNTER_FIELDS),
+    "Sector": (("sector",), SECTOR_STATUS_FIELDS),
+    "Event Sector": (("event", "sector"), EVENT_SECTOR_STATUS_FIELDS),
+}
+
+# Redis sets of records waiting for a coalesced recount
+DIRTY_KEYS = {
+    "Event Readiness": "psn_dirty_events",
+    "Sector": "psn_dirty_sectors",
+}
+
+
+def get_status_deltas(old_status=None, new_status=None, status_fields=STATUS_COUNTER_FIELDS):
+    """
+    Counter deltas for one task moving from old_status to new_status.
+
+    old_status=None → task was added
+    new_status=None → task was removed
+    """
+    deltas = {}
+
+    if old_status is None and new_status is None:
+        return deltas
+
+    if old_status is None:
+        deltas["total_tasks"] = 1
+    elif new_status is None:
+        deltas["total_tasks"] = -1
+
+    old_field = status_fields.get(old_status)
+    new_field = status_fields.get(new_status)
+
+    if old_field == new_field:
+        return deltas
+
+    if old_field:
+        deltas[old_field] = deltas.get(old_field, 0) - 1
+    if new_field:
+        deltas[new_field] = deltas.get(new_field, 0) + 1
+
+    return deltas
+
+
+def apply_counter_deltas(event_name, deltas):
+    """
+    Apply counter deltas to one Event Readiness row in a single UPDATE.
+
+    event_readiness is assigned first so it is computed from the
+    pre-update column values plus the deltas, whichever assignment
+    semantics the database uses.
+    """
+    deltas = {k: v for k, v in (deltas or {}).items() if v and k in COUNTER_FIELDS}
+    if not event_name or not deltas:
+        return
+
+    values = {f: deltas.get(f, 0) for f in COUNTER_FIELDS}
+    values["event"] = event_name
+
+    assignments = ", ".join(
+        f"`{f}` = GREATEST(IFNULL(`{f}`, 0) + %({f})s, 0)"
+        for f in COUNTER_FIELDS if deltas.get(f)
+    )
+
+    frappe.db.sql(f"""
+        UPDATE `tabEvent Readiness`
+        SET
+            `event_readiness` = IFNULL(FLOOR(
+                GREATEST(IFNULL(`completed_tasks`, 0) + %(completed_tasks)s, 0) * 100
+                / NULLIF(GREATEST(IFNULL(`total_tasks`, 0) + %(total_tasks)s, 0), 0)
+            ), 0),
+            {assignments}
+        WHERE name = %(event)s
+    """, values)
+
+    frappe.clear_document_cache("Event Readiness", event_name)
+
+
+def apply_sector_deltas(sector, deltas):
+    """Apply counter deltas to one Sector row; same rules as apply_counter_deltas."""
+    deltas = {k: v for k, v in (deltas or {}).items() if v and k in SECTOR_COUNTER_FIELDS}
+    if not sector or not deltas:
+        return
+
+    values = {f: deltas.get(f, 0) for f in SECTOR_COUNTER_FIELDS}
+    values["sector"] = sector
+
+    assignments = ", ".join(
+        f"`{f}` = GREATEST(IFNULL(`{f}`, 0) + %({f})s, 0)"
+        for f in SECTOR_COUNTER_FIELDS if deltas.get(f)
+    )
+
+    frappe.db.sql(f"""
+        UPDATE `tabSector`
+        SET
+            `sector_readiness` = IFNULL(ROUND(
+                GREATEST(IFNULL(`completed_tasks`, 0) + %(completed_tasks)s, 0) * 100
+                / NULLIF(GREATEST(IFNULL(`total_tasks`, 0) + %(total_tasks)s, 0), 0),
+            2), 0),
+            {assignments}
+        WHERE name = %(sector)s
+    """, values)
+
+    frappe.clear_document_cache("Sector", sector)
+
+
+def get_event_sector_name(event_name, sector):
+    # matches the doctype's format:{event}-{sector} autoname
+    return f"{event_name}-{sector}"
+
+
+def get_sector_lead_map(sectors):
+    """Return {sector: lead user} for the given sectors in one query."""
+    if not sectors:
+        return {}
+
+    leads = frappe.get_all(
+        "Sector Member",
+        filters={
+            "parenttype": "Sector",
+            "parent": ["in", list(sectors)],
+            "is_sector_lead": 1
+        },
+        fields=["parent", "user"],
+        order_by="idx asc"
+    )
+
+    lead_map = {}
+    for row in leads:
+        lead_map.setdefault(row.parent, row.user)
+
+    return lead_map
+
+
+def apply_event_sector_deltas(event_name, sector, deltas, sector_lead=None):
+    """
+    Apply counter deltas to the (event, sector) row, creating it on
+    first use, in a single INSERT … ON DUPLICATE KEY UPDATE.
+    readiness is assigned first, as in apply_counter_deltas.
+
+    New rows take sector_lead (the sector's lead); a row whose last
+    task left is removed.
+    """
+    deltas = {k: v for k, v in (deltas or {}).items() if v and k in EVENT_SECTOR_COUNTER_FIELDS}
+    if not event_name or not sector or not deltas:
+        return
+
+    values = {f: deltas.get(f, 0) for f in EVENT_SECTOR_COUNTER_FIELDS}
+    values.update({
+        "name": get_event_sector_name(event_name, sector),
+        "event": event_name,
+        "sector": sector,
+        "sector_lead": sector_lead,
+        "now": now(),
+        "user": frappe.session.user,
+    })
+
+    columns = ", ".join(f"`{f}`" for f in EVENT_SECTOR_COUNTER_FIELDS)
+    inserts = ", ".join(f"GREATEST(%({f})s, 0)" for f in EVENT_SECTOR_COUNTER_FIELDS)
+    assignments = ", ".join(
+        f"`{f}` = GREATEST(IFNULL(`{f}`, 0) + %({f})s, 0)"
+        for f in EVENT_SECTOR_COUNTER_FIELDS if deltas.get(f)
+    )
+
+    frappe.db.sql(f"""
+        INSERT INTO `tabEvent Sector`
+            (name, creation, modified, owner, modified_by, docstatus, idx,
+             event, sector, sector_lead, readiness, {columns})
+        VALUES
+            (%(name)s, %(now)s, %(now)s, %(user)s, %(user)s, 0, 0,
+             %(event)s, %(sector)s, %(sector_lead)s,
+             IFNULL(FLOOR(GREATEST(%(completed_tasks)s, 0) * 100
+                / NULLIF(GREATEST(%(total_tasks)s, 0), 0)), 0),
+             {inserts})
+        ON DUPLICATE KEY UPDATE
+            `readiness` = IFNULL(FLOOR(
+                GREATEST(IFNULL(`completed_tasks`, 0) + %(completed_tasks)s, 0) * 100
+                / NULLIF(GREATEST(IFNULL(`total_tasks`, 0) + %(total_tasks)s, 0), 0)
+            ), 0),
+            {assignments},
+            `sector_lead` = IFNULL(`sector_lead`, %(sector_lead)s),
+            `modified` = %(now)s
+    """, values)
+
+    if deltas.get("total_tasks", 0) < 0:
+        frappe.db.delete("Event Sector", {"name": values["name"], "total_tasks": 0})
+
+
+def apply_task_change(previous=None, current=None):
+    """
+    Record a task change against its event, sector and event-sector
+    counters.
+
+    previous / current: the task before and after the change (anything
+    with event, sector and status), None for an insert / a delete.
+
+    Deltas are merged per record and written once at commit time.
+    During imports (or when psn_defer_event_counters is set) the
+    records are only marked dirty and recounted by the coalescing job.
+    """
+    old_status = (previous.status or "") if previous else None
+    new_status = (current.status or "") if current else None
+
+    for doctype, (key_fields, status_fields) in COUNTER_TARGETS.items():
+        old_key = _get_target_key(previous, key_fields)
+        new_key = _get_target_key(current, key_fields)
+
+        if old_key == new_key:
+            _record_deltas(doctype, new_key, get_status_deltas(old_status, new_status, status_fields))
+            continue
+
+        _record_deltas(doctype, old_key, get_status_deltas(old_status, None, status_fields))
+        _record_deltas(doctype, new_key, get_status_deltas(None, new_status, status_fields))
+
+
+def _get_target_key(task, key_fields):
+    if not task:
+        return None
+
+    key = tuple(task.get(f) for f in key_fields)
+    return key if all(key) else None
+
+
+def _record_deltas(doctype, key, deltas):
+    if not key or not deltas:
+        return
+
+    if frappe.flags.in_import or frappe.flags.psn_defer_event_counters:
+        # event-sector rows are recounted together with their event
+        if doctype == "Event Sector":
+            mark_dirty("Event Readiness", key[0])
+        else:
+            mark_dirty(doctype, key[0])
+        return
+
+    queue_counter_deltas(doctype, key, deltas)
+
+
+# -------------------------
+# Per-transaction delta queue
+# -------------------------
+def queue_counter_deltas(doctype, key, deltas):
+    pending = getattr(frappe.local, "psn_counter_deltas", None)
+
+    if pending is None:
+        pending = frappe.local.psn_counter_deltas = {}
+        frappe.db.before_commit.add(flush_counter_deltas)
+        frappe.db.after_rollback.add(discard_counter_deltas)
+
+    record_deltas = pending.setdefault((doctype, key), {})
+    for field, delta in deltas.items():
+        record_deltas[field] = record_deltas.get(field, 0) + delta
+
+
+def flush_counter_deltas():
+    pending = getattr(frappe.local, "psn_counter_deltas", None) or {}
+    frappe.local.psn_counter_deltas = None
+
+    if pending:
+        bump_data_version("events", "sectors")
+
+    lead_map = get_sector_lead_map({key[1] for doctype, key in pending if doctype == "Event Sector"})
+
+    for (doctype, key), deltas in pending.items():
+        if doctype == "Event Readiness":
+            apply_counter_deltas(key[0], deltas)
+            queue_realtime_delta(
+                {"type": "event_counters", "event": key[0], "deltas": deltas},
+                events=[key[0]]
+            )
+        elif doctype == "Sector":
+            apply_sector_deltas(key[0], deltas)
+            queue_realtime_delta(
+                {"type": "sector_counters", "sector": key[0], "deltas": deltas},
+                sectors=[key[0]]
+            )
+        else:
+            apply_event_sector_deltas(*key, deltas, sector_lead=lead_map.get(key[1]))
+            queue_realtime_delta(
+                {"type": "event_sector_counters", "event": key[0], "sector": key[1], "deltas": deltas},
+                events=[key[0]]
+            )
+
+
+def discard_counter_deltas():
+    frappe.local.psn_counter_deltas = None
+
+
+# -------------------------
+# Coalesced recount
+# -------------------------
+def mark_dirty(doctype, name):
+    frappe.cache().sadd(DIRTY_KEYS[doctype], name)
+
+
+def _pop_dirty(doctype):
+    key = DIRTY_KEYS[doctype]
+    names = [
+        n.decode() if isinstance(n, bytes) else n
+        for n in frappe.cache().smembers(key)
+    ]
+    if names:
+        frappe.cache().srem(key, *names)
+    return names
+
+
+def flush_dirty_counters():
+    """
+    Scheduled every minute: recount each event and sector marked dirty
+    since the last run once, however many updates it received.
+    """
+    events = _pop_dirty("Event Readiness")
+    sectors = _pop_dirty("Sector")
+
+    if not events and not sectors:
+        return
+
+    for event_name in events:
+        if frappe.db.exists("Event Readiness", event_name):
+            recount_event_counters(event_name)
+            recount_event_sectors(event_name)
+
+    if sectors:
+        refresh_sector_rollups(sectors)
+
+    frappe.db.commit()
+
+
+# -------------------------
+# Repair paths
+# -------------------------
+def recount_event_counters(event_name):
+    """
+    Repair path: rebuild all counters of an event from its tasks
+    with one grouped query.
+    """
+    rows = frappe.db.sql("""
+        SELECT status, COUNT(*) AS cnt
+        FROM `tabEvent Task`
+        WHERE event = %s
+        GROUP BY status
+    """, event_name, as_dict=True)
+
+    counters = dict.fromkeys(COUNTER_FIELDS, 0)
+
+    for row in rows:
+        counters["total_tasks"] += row.cnt
+        field = STATUS_COUNTER_FIELDS.get(row.status)
+        if field:
+            counters[field] += row.cnt
+
+    total = counters["total_tasks"]
+    completed = counters["completed_tasks"]
+    counters["event_readiness"] = int((completed / total) * 100) if total else 0
+
+    frappe.db.set_value("Event Readiness", event_name, counters)
+    frappe.clear_document_cache("Event Readiness", event_name)
+    bump_data_version("events")
+    queue_realtime_delta({"type": "event_refresh", "event": event_name}, events=[event_name])
+
+    return counters
+
+
+def recount_event_sectors(event_name):
+    """
+    Repair path: rebuild the Event Sector rows of an event from its
+    tasks with one grouped query. Rows for sectors that no longer have
+    tasks are removed; a manually set sector_lead is kept, otherwise
+    the sector's lead is filled in.
+    """
+    rows = frappe.db.sql("""
+        SELECT sector, status, COUNT(*) AS cnt
+        FROM `tabEvent Task`
+        WHERE event = %s AND IFNULL(sector, '') != ''
+        GROUP BY sector, status
+    """, event_name, as_dict=True)
+
+    counters = {}
+    for row in rows:
+        sector_counters = counters.setdefault(
+            row.sector, dict.fromkeys(EVENT_SECTOR_COUNTER_FIELDS, 0)
+        )
+        sector_counters["total_tasks"] += row.cnt
+        field = EVENT_SECTOR_STATUS_FIELDS.get(row.status)
+        if field:
+            sector_counters[field] += row.cnt
+
+    lead_map = dict(frappe.get_all(
+        "Event Sector",
+        filters={"event": event_name},
+        fields=["sector", "sector_lead"],
+        as_list=True
+    ))
+
+    default_leads = get_sector_lead_map(counters)
+
+    frappe.db.delete("Event Sector", {"event": event_name})
+
+    now_ts = now()
+    user = frappe.session.user
+
+    values = []
+    for sector, c in sorted(counters.items()):
+        total = c["total_tasks"]
+        readiness = int((c["completed_tasks"] / total) * 100) if total else 0
+
+        values.append((
+            get_event_sector_name(event_name, sector), now_ts, now_ts, user, user, 0, 0,
+            event_name, sector, lead_map.get(sector) or default_leads.get(sector), readiness,
+            *(c[f] for f in EVENT_SECTOR_COUNTER_FIELDS)
+        ))
+
+    if values:
+        frappe.db.bulk_insert("Event Sector", [
+            "name", "creation", "modified", "owner", "modified_by", "docstatus", "idx",
+            "event", "sector", "sector_lead", "readiness", *EVENT_SECTOR_COUNTER_FIELDS
+        ], values, chunk_size=500)
+
+    bump_data_version("events")
+
+    return counters
+
+
+def refresh_sector_rollups(sectors=None):
+    """
+    Repair path: rebuild the counters of the given sectors (all sectors
+    when None) with one grouped query and one batched write.
+    """
+    if sectors is None:
+        sectors = frappe.get_all("Sector", pluck="name")
+    sectors = [s for s in sectors if s]
+
+    if not sectors:
+        return {}
+
+    rows = frappe.db.sql("""
+        SELECT
+            sector,
+            COUNT(*) AS total_tasks,
+            SUM(CASE WHEN status = 'Completed' THEN 1 ELSE 0 END) AS completed_tasks,
+            SUM(CASE WHEN status = 'In Progress' THEN 1 ELSE 0 END) AS in_progress_tasks
+        FROM `tabEvent Task`
+        WHERE sector IN %(sectors)s
+        GROUP BY sector
+    """, {"sectors": sectors}, as_dict=True)
+
+    stats_map = {r.sector: r for r in rows}
+    updates = {}
+
+    for sector in sectors:
+        stats = stats_map.get(sector) or frappe._dict()
+
+        total_tasks = cint(stats.total_tasks)
+        completed_tasks = cint(stats.completed_tasks)
+
+        updates[sector] = {
+            "total_tasks": total_tasks,
+            "completed_tasks": completed_tasks,
+            "in_progress_tasks": cint(stats.in_progress_tasks),
+            "sector_readiness": (
+                flt((completed_tasks / total_tasks) * 100, 2)
+                if total_tasks > 0 else 0
+            ),
+        }
+
+    frappe.db.bulk_update("Sector", updates, chunk_size=500, update_modified=False)
+    bump_data_version("sectors")
+
+    for sector, counters in updates.items():
+        frappe.clear_document_cache("Sector", sector)
+        queue_realtime_delta({"type": "sector_refresh", "sector": sector, "counters": counters}, sectors=[sector])
+
+    return updates
+
+
+def refresh_all_sector_rollups():
+    """Scheduled daily: full sector rollup as a safety net for the deltas."""
+    refresh_sector_rollups()
+    frappe.db.commit()
@@ -1,36 +1,64 @@
 import csv
+import io
 import json
 import math
-import os
 
 import frappe
-from frappe.utils import add_days, cint, flt, nowdate
-
-from psn_custom_rdb_app.psn_readiness_dashboard.doctype.user_sector_kpi.user_sector_kpi import \
-    recalculate_kpi_for_user_sector
+from frappe.utils import add_days, cint, flt, now, nowdate
+
+from psn_custom_rdb_app.psn_readiness_dashboard.access_scope import get_access_scope, get_task_filters
+from psn_custom_rdb_app.psn_readiness_dashboard.doctype.event_task_transition.event_task_transition import (
+    log_task_transition,
+    log_transitions,
+)
+from psn_custom_rdb_app.psn_readiness_dashboard.doctype.event_visibility.event_visibility import (
+    rebuild_event_visibility,
+)
+from psn_custom_rdb_app.psn_readiness_dashboard.doctype.user_sector_kpi.user_sector_kpi import (
+    recalculate_kpi_for_user_sector,
+    sync_kpi_memberships,
+)
+from psn_custom_rdb_app.psn_readiness_dashboard.event_counters import (
+    apply_task_change,
+    get_sector_lead_map,
+    recount_event_counters,
+    recount_event_sectors,
+    refresh_sector_rollups,
+)
+from psn_custom_rdb_app.psn_readiness_dashboard.pagination import (
+    EVENT_TASK_FIELDS,
+    get_task_page,
+    parse_fields,
+)
+from psn_custom_rdb_app.psn_readiness_dashboard.realtime_deltas import queue_task_delta
+from psn_custom_rdb_app.psn_readiness_dashboard.response_cache import bump_data_version
 
 frappe.flags.ignore_csrf = True
 
+USER_TASK_FIELDS = [
+    "name", "event", "l2_task_name", "sector",
+    "status", "incharge", "due_date", "progress"
+]
+
+TASK_WEIGHTAGE = {
+    "Pending": 0,
+    "Delayed": 0,
+    "In Progress": 50,
+    "Completed": 100
+}
+
 
 @frappe.whitelist()
 def get_logged_in_user_details():
     user = frappe.session.user
-
-    kpis = frappe.get_all(
-        "User Sector KPI",
-        filters={"user": user},
-        fields=["sector", "custom_is_sector_lead"]
-    )
-
-    sectors = [k.sector for k in kpis]
-    is_lead = any(k.custom_is_sector_lead for k in kpis)
+    scope = get_access_scope(user)
 
     return {
         "user": user,
-        "full_name": frappe.db.get_value("User", user, "full_name"),
-        "sector_list": sectors,
-        "is_sector_lead": is_lead,
-        "roles": frappe.get_roles(user)
+        "full_name": frappe.get_cached_value("User", user, "full_name"),
+        "sector_list": scope.sectors,
+        "is_sector_lead": scope.is_lead,
+        "roles": scope.roles
     }
 
 
@@ -48,39 +76,23 @@ def get_event_list():
 
 
 @frappe.whitelist()
-def get_all_tasks_for_user():
-    user = frappe.session.user
-
-    # fetch user sectors and lead status
-    sector_list = []
-    is_lead = False
-
-    kpis = frappe.get_all(
-        "User Sector KPI",
-        filters={"user": user},
-        fields=["sector", "custom_is_sector_lead"]
-    )
-
-    if kpis:
-        sector_list = [k.sector for k in kpis]
-        is_lead = any(k.custom_is_sector_lead for k in kpis)
+def get_all_tasks_for_user(page_size=None, cursor=None, fields=None):
+    """
+    Tasks visible to the current user, ordered by due date.
 
-    filters = {}
+    Without page_size the full list is returned (legacy behaviour);
+    with page_size a keyset page {tasks, next_cursor, total_count}.
+    """
+    filters = get_task_filters()
+    fields = parse_fields(fields, USER_TASK_FIELDS, required=("name", "due_date"))
 
-    if user == "Administrator":
-        pass
-    elif is_lead and sector_list:
-        filters["sector"] = ["in", sector_list]
-    else:
-        filters["incharge"] = user
+    if page_size:
+        return get_task_page(filters, "due_date", fields, page_size, cursor)
 
     return frappe.get_all(
         "Event Task",
         filters=filters,
-        fields=[
-            "name", "event", "l2_task_name", "sector",
-            "status", "incharge", "due_date", "progress"
-        ],
+        fields=fields,
         order_by="due_date asc"
     )
 
@@ -121,99 +133,71 @@ def enqueue_default_event_tasks(doc, method=None):
 
 
 def update_task_weightage(doc, method=None):
-    weightage_map = {
-        "Pending": 0,
-        "Delayed": 0,
-        "In Progress": 50,
-        "Completed": 100
-    }
-
-    doc.weightage = weightage_map.get(doc.status, 0)
+    doc.weightage = TASK_WEIGHTAGE.get(doc.status, 0)
     doc.progress = doc.weightage
 
-    update_event_task_stats(doc.event)
+    # Apply only the old → new change to the event and sector counters
+    previous = doc.get_doc_before_save()
 
+    if not previous:
+        apply_task_change(None, doc)
+        log_task_transition(doc)
+        return
 
-def update_event_task_stats(event_name):
-    tasks = frappe.get_all(
-        "Event Task",
-        filters={"event": event_name},
-        fields=["status"]
-    )
+    if (previous.event, previous.sector, previous.status) != (doc.event, doc.sector, doc.status):
+        apply_task_change(previous, doc)
+
+    if previous.status != doc.status or previous.event != doc.event:
+        log_task_transition(doc, previous.status)
 
-    total = len(tasks)
-    pending = sum(1 for t in tasks if t.status == "Pending")
-    in_progress = sum(1 for t in tasks if t.status == "In Progress")
-    completed = sum(1 for t in tasks if t.status == "Completed")
-    delayed = sum(1 for t in tasks if t.status == "Delayed")
-
-    readiness = int((completed / total) * 100) if total else 0
-
-    frappe.db.set_value("Event Readiness", event_name, {
-        "total_tasks": total,
-        "pending_tasks": pending,
-        "custom_in_progress_tasks": in_progress,
-        "completed_tasks": completed,
-        "delayed_tasks": delayed,
-        "event_readiness": readiness,
-    })
-    frappe.db.commit()
+
+def remove_task_from_event_stats(doc, method=None):
+    apply_task_change(doc, None)
+
+
+def update_event_task_stats(event_name):
+    """
+    Full recount of the event counters.
+    Repair path only — task saves apply deltas via update_task_weightage.
+    Runs in the caller's transaction; no commit here.
+    """
+    recount_event_counters(event_name)
+    recount_event_sectors(event_name)
 
 
 @frappe.whitelist()
-def get_tasks_for_event(event_name):
+def get_tasks_for_event(event_name, page_size=None, cursor=None, fields=None):
     user = frappe.session.user
-    roles = frappe.get_roles(user)
-
-    is_admin = "Event Readiness Admin" in roles or user == "Administrator"
-    is_sector_lead = False
-    user_sectors = []
 
     # -------------------------
-    # Load sector mappings
+    # Load access scope (cached)
     # -------------------------
-    kpi_entries = frappe.get_all(
-        "User Sector KPI",
-        filters={"user": user},
-        fields=["sector", "custom_is_sector_lead"]
-    )
-
-    if kpi_entries:
-        user_sectors = [k.sector for k in kpi_entries]
-        is_sector_lead = any(k.custom_is_sector_lead for k in kpi_entries)
+    scope = get_access_scope(user)
+    is_admin = scope.is_admin
+    is_sector_lead = scope.is_lead
+    user_sectors = scope.sectors
 
     # -------------------------
     # Build task filters
     # -------------------------
-    filters = {"event": event_name}
-
-    if not is_admin:
-        # Sector Lead → sector-based visibility
-        if is_sector_lead and user_sectors:
-            filters["sector"] = ["in", user_sectors]
-
-        # Sector Member → only assigned tasks
-        else:
-            filters["incharge"] = user
+    filters = {"event": event_name, **get_task_filters(user, scope)}
 
     # -------------------------
-    # Fetch tasks
+    # Fetch tasks (optionally one keyset page)
     # -------------------------
-    tasks = frappe.get_all(
-        "Event Task",
-        filters=filters,
-        fields=[
-            "name",
-            "l2_task_name",
-            "sector",
-            "status",
-            "incharge",
-            "creation",
-            "due_date",
-            "progress"
-        ],
-        order_by="creation asc"
-    )
+    fields = parse_fields(fields, EVENT_TASK_FIELDS, required=("name", "creation"))
+    page = {}
+
+    if page_size:
+        page = get_task_page(filters, "creation", fields, page_size, cursor)
+        tasks = page["tasks"]
+    else:
+        tasks = frappe.get_all(
+            "Event Task",
+            filters=filters,
+            fields=fields,
+            order_by="creation asc"
+        )
 
     # -------------------------
     # Sector → Users mapping (ONLY for admins & leads)
@@ -221,7 +205,7 @@ def get_tasks_for_event(event_name):
     sector_users = {}
 
     if is_admin or is_sector_lead:
-        relevant_sectors = list({t.sector for t in tasks if t.sector})
+        relevant_sectors = list({t.get("sector") for t in tasks if t.get("sector")})
 
         if relevant_sectors:
             members = frappe.get_all(
@@ -241,7 +225,9 @@ def get_tasks_for_event(event_name):
         "user": user,
         "user_sector_list": user_sectors,
         "user_is_lead": is_sector_lead,
-        "sector_users": sector_users
+        "sector_users": sector_users,
+        "next_cursor": page.get("next_cursor"),
+        "total_count": page.get("total_count", len(tasks))
     }
 
 
@@ -257,29 +243,11 @@ def update_task_incharge(task_name, user):
 def update_event_task_status(l2_task_name, status, delay_reason=None):
     task = frappe.get_doc("Event Task", l2_task_name)
     user = frappe.session.user
-    roles = frappe.get_roles(user)
-    if user == "Administrator" or "Event Readiness Admin" in roles:
-        pass
-
-    else:
-        kpi_entries = frappe.get_all(
-            "User Sector KPI",
-            filters={"user": user},
-            fields=["sector", "custom_is_sector_lead"]
-        )
 
-        if not kpi_entries:
-            frappe.throw("You are not assigned to any sector")
+    error = get_task_update_error(task, user, get_access_scope(user))
+    if error:
+        frappe.throw(error)
 
-        user_sectors = [k.sector for k in kpi_entries]
-        is_sector_lead = any(k.custom_is_sector_lead for k in kpi_entries)
-        # Sector mismatch
-        if task.sector not in user_sectors:
-            frappe.throw("You cannot update tasks outside your sector")
-
-        # Sector member can update ONLY their own tasks
-        if not is_sector_lead and task.incharge != user:
-            frappe.throw("You can only update tasks assigned to you")
     task.status = status
 
     if status == "Delayed":
@@ -290,11 +258,150 @@ def update_event_task_status(l2_task_name, status, delay_reason=None):
         task.delay_reason = None
 
     task.save()
-    update_event_task_stats(task.event)
 
     frappe.db.commit()
 
 
+def get_task_update_error(task, user, scope):
+    """Return why the user may not update the task, or None."""
+    if scope.is_admin:
+        return None
+
+    if not scope.sectors:
+        return "You are not assigned to any sector"
+
+    # Sector mismatch
+    if task.sector not in scope.sectors:
+        return "You cannot update tasks outside your sector"
+
+    # Sector member can update ONLY their own tasks
+    if not scope.is_lead and task.incharge != user:
+        return "You can only update tasks assigned to you"
+
+    return None
+
+
+@frappe.whitelist()
+def update_event_task_statuses(updates):
+    """
+    Batch status update for many tasks.
+
+    updates: list of {"task", "status", "delay_reason"}
+
+    Permissions are checked once against the caller's scope; all
+    changes are applied in one transaction and each affected event's
+    counters are updated once.
+
+    Rows are written with bulk_update, so no controller hooks run:
+    modified / modified_by and updated_on are set here, and status
+    changes are recorded in the Event Task Transition ledger. Event Task
+    does not track changes, so no Version rows are expected either way.
+    """
+    if isinstance(updates, str):
+        updates = json.loads(updates or "[]")
+    if not updates:
+        frappe.throw("No task updates given")
+
+    user = frappe.session.user
+    scope = get_access_scope(user)
+
+    # -------------------------
+    # 1️⃣ Load all tasks in one query
+    # -------------------------
+    task_names = [u.get("task") for u in updates]
+    tasks = {
+        t.name: t
+        for t in frappe.get_all(
+            "Event Task",
+            filters={"name": ["in", task_names]},
+            fields=["name", "event", "sector", "incharge", "status", "delay_reason"]
+        )
+    }
+
+    # -------------------------
+    # 2️⃣ Validate everything before writing
+    # -------------------------
+    errors = []
+    for row in updates:
+        task = tasks.get(row.get("task"))
+        status = row.get("status")
+
+        if not task:
+            errors.append(f"{row.get('task')}: task not found")
+        elif status not in TASK_WEIGHTAGE:
+            errors.append(f"{task.name}: invalid status {status}")
+        elif status == "Delayed" and not row.get("delay_reason"):
+            errors.append(f"{task.name}: Delay reason is required")
+        else:
+            error = get_task_update_error(task, user, scope)
+            if error:
+                errors.append(f"{task.name}: {error}")
+
+    if errors:
+        frappe.throw("<br>".join(errors), title="Task updates not applied")
+
+    # -------------------------
+    # 3️⃣ Build row updates, counter deltas and ledger rows
+    # -------------------------
+    doc_updates = {}
+    events = set()
+    transitions = []
+    updated_on = now()
+
+    for row in updates:
+        task = tasks[row["task"]]
+        status = row["status"]
+        delay_reason = row.get("delay_reason") if status == "Delayed" else None
+
+        if status == task.status and delay_reason == task.delay_reason:
+            continue
+
+        doc_updates[task.name] = {
+            "status": status,
+            "delay_reason": delay_reason,
+            "weightage": TASK_WEIGHTAGE[status],
+            "progress": TASK_WEIGHTAGE[status],
+            "updated_on": updated_on,
+        }
+
+        if status != task.status:
+            # merged per event / sector, written once at commit
+            updated_task = frappe._dict(task, status=status)
+            apply_task_change(task, updated_task)
+            queue_task_delta(updated_task, task, ["status"])
+            events.add(task.event)
+
+            transitions.append({
+                "task": task.name,
+                "event": task.event,
+                "sector": task.sector,
+                "incharge": task.incharge,
+                "from_status": task.status,
+                "to_status": status,
+            })
+
+            # later entries for the same task chain from this status
+            task.status = status
+        task.delay_reason = delay_reason
+
+    # -------------------------
+    # 4️⃣ Apply in one transaction
+    # -------------------------
+    if doc_updates:
+        frappe.db.bulk_update(
+            "Event Task", doc_updates, chunk_size=500, modified=updated_on, modified_by=user
+        )
+        log_transitions(transitions)
+        bump_data_version("tasks")
+
+    frappe.db.commit()
+
+    return {
+        "updated": len(doc_updates),
+        "events": sorted(e for e in events if e)
+    }
+
+
 @frappe.whitelist()
 def create_event_task_from_popup(event, l2_task_name, sector, incharge=None, due_date=None, task_description=None):
     task = frappe.new_doc("Event Task")
@@ -307,7 +414,6 @@ def create_event_task_from_popup(event, l2_task_name, sector, incharge=None, due
     task.status = "Pending"
     task.weightage = 0
     task.insert(ignore_permissions=True)
-    update_event_task_stats(event)
     return task.name
 
 
@@ -326,8 +432,30 @@ def get_event_dashboard_stats():
 def create_sector_user(full_name, email, sectors):
     if isinstance(sectors, str):
         sectors = json.loads(sectors or "[]")
+
+    user, role_to_assign = new_sector_user(full_name, email, sectors)
+    add_sector_memberships([
+        {"user": user, "sector": row.get("sector"), "is_sector_lead": row.get("is_sector_lead")}
+        for row in sectors
+    ])
+
+    frappe.db.commit()
+    return {
+        "message": "User created successfully",
+        "user": user,
+        "role": role_to_assign
+    }
+
+
+def new_sector_user(full_name, email, sectors):
+    """
+    Validate one onboarding entry and insert its User.
+    Sector membership is added separately (add_sector_memberships).
+    """
     if not sectors:
         frappe.throw("Please add at least one sector assignment")
+    if not email:
+        frappe.throw("Email is required")
     if frappe.db.exists("User", {"email": email}):
         frappe.throw(f"User with email {email} already exists")
     is_sector_lead = any(cint(row.get("is_sector_lead")) for row in sectors)
@@ -344,44 +472,232 @@ def create_sector_user(full_name, email, sectors):
     if frappe.db.has_column("User", "sector") and first_sector:
         user.sector = first_sector
     user.insert(ignore_permissions=True)
-    for row in sectors:
-        sector_name = row.get("sector")
-        is_lead = cint(row.get("is_sector_lead"))
-        if not sector_name:
-            continue
-        sec_doc = frappe.get_doc("Sector", sector_name)
-        existing_member = next(
-            (m for m in sec_doc.members if m.user == user.name),
-            None
+    return user.name, role_to_assign
+
+
+SECTOR_MEMBER_FIELDS = [
+    "name", "creation", "modified", "owner", "modified_by", "docstatus", "idx",
+    "parent", "parenttype", "parentfield", "user", "is_sector_lead"
+]
+
+
+def add_sector_memberships(assignments):
+    """
+    Add (user, sector, is_sector_lead) assignments as Sector Member child
+    rows without loading or saving the Sector documents: new rows are
+    bulk-inserted after each sector's last idx, existing rows only get
+    their lead flag updated. KPI rows follow via sync_kpi_memberships.
+    Runs in the caller's transaction; no commit here.
+    """
+    wanted = {}
+    for row in assignments:
+        if row.get("user") and row.get("sector"):
+            wanted[(row["sector"], row["user"])] = cint(row.get("is_sector_lead"))
+
+    if not wanted:
+        return
+
+    sectors = sorted({sector for sector, _ in wanted})
+    users = sorted({user for _, user in wanted})
+
+    # -------------------------
+    # 1️⃣ Existing rows + last idx per sector (one query each)
+    # -------------------------
+    existing = {
+        (m.parent, m.user): m
+        for m in frappe.get_all(
+            "Sector Member",
+            filters={
+                "parenttype": "Sector",
+                "parent": ["in", sectors],
+                "user": ["in", users]
+            },
+            fields=["name", "parent", "user", "is_sector_lead"]
         )
-        if existing_member:
-            existing_member.is_sector_lead = is_lead
-        else:
-            sec_doc.append("members", {
-                "user": user.name,
-                "is_sector_lead": is_lead
-            })
-        sec_doc.save(ignore_permissions=True)
-        if not frappe.db.exists("User Sector KPI", {
-            "user": user.name,
-            "sector": sector_name
-        }):
-            frappe.get_doc({
-                "doctype": "User Sector KPI",
-                "user": user.name,
-                "sector": sector_name,
-                "total_tasks": 0,
-                "completed_tasks": 0,
-                "pending_tasks": 0,
-                "delayed_tasks": 0,
-                "avg_completion_time": 0,
-            }).insert(ignore_permissions=True)
-    frappe.db.commit()
+    }
+
+    next_idx = {
+        r.parent: cint(r.max_idx) + 1
+        for r in frappe.db.sql("""
+            SELECT parent, MAX(idx) AS max_idx
+            FROM `tabSector Member`
+            WHERE parenttype = 'Sector' AND parent IN %(sectors)s
+            GROUP BY parent
+        """, {"sectors": sectors}, as_dict=True)
+    }
+
+    # -------------------------
+    # 2️⃣ Child-row inserts / lead flag updates
+    # -------------------------
+    now_ts = now()
+    owner = frappe.session.user
+    values = []
+    lead_updates = {}
+
+    for (sector, user), is_lead in sorted(wanted.items()):
+        member = existing.get((sector, user))
+
+        if member:
+            if cint(member.is_sector_lead) != is_lead:
+                lead_updates[member.name] = {"is_sector_lead": is_lead}
+            continue
+
+        idx = next_idx.get(sector, 1)
+        next_idx[sector] = idx + 1
+
+        values.append((
+            frappe.generate_hash(length=10), now_ts, now_ts, owner, owner, 0, idx,
+            sector, "Sector", "members", user, is_lead
+        ))
+
+    if values:
+        frappe.db.bulk_insert("Sector Member", SECTOR_MEMBER_FIELDS, values, chunk_size=500)
+    if lead_updates:
+        frappe.db.bulk_update("Sector Member", lead_updates, chunk_size=500)
+
+    for sector in sectors:
+        frappe.clear_document_cache("Sector", sector)
+    bump_data_version("sectors")
+
+    # -------------------------
+    # 3️⃣ KPI rows, access scopes and visibility for these users
+    # -------------------------
+    sync_kpi_memberships(users)
+
+
+@frappe.whitelist()
+def onboard_sector_users(users=None, csv_file=None):
+    """
+    Batch onboarding of sector users, from either:
+      - users: JSON list of {full_name, email, sectors: [{sector, is_sector_lead}]}
+      - csv_file: file_url of a CSV with Full Name, Email, Sector, Is Sector Lead
+        columns (one row per sector assignment)
+
+    Runs as a background job; progress and the final summary (with
+    per-row errors) are published on the "sector_user_onboarding"
+    realtime event.
+    """
+    frappe.only_for(("System Manager", "Event Readiness Admin"))
+
+    if isinstance(users, str):
+        users = json.loads(users or "[]")
+
+    if csv_file:
+        # resolve through the File record (never a raw path) and its permissions
+        file_doc = frappe.get_doc("File", {"file_url": csv_file})
+        file_doc.check_permission("read")
+        users = read_onboarding_csv(file_doc.get_content())
+
+    if not users:
+        frappe.throw("No users to onboard")
+
+    job = frappe.enqueue(
+        "psn_custom_rdb_app.psn_readiness_dashboard.event_logic.onboard_sector_users_bg",
+        queue="long",
+        timeout=3600,
+        users=users,
+        user=frappe.session.user
+    )
+
     return {
-        "message": "User created successfully",
-        "user": user.name,
-        "role": role_to_assign
+        "message": "Sector user onboarding started",
+        "total": len(users),
+        "job_id": job.id if job else None
+    }
+
+
+def read_onboarding_csv(content):
+    """Group CSV rows (one per sector assignment) into onboarding entries by email."""
+    if isinstance(content, bytes):
+        content = content.decode("utf-8-sig")
+
+    entries = {}
+
+    with io.StringIO(content.lstrip("\ufeff"), newline="") as f:
+        for row_no, row in enumerate(csv.DictReader(f), start=2):
+            email = (row.get("Email") or "").strip()
+            entry = entries.setdefault(email.lower() or f"row-{row_no}", {
+                "row": row_no,
+                "full_name": (row.get("Full Name") or "").strip(),
+                "email": email,
+                "sectors": []
+            })
+
+            sector = (row.get("Sector") or "").strip()
+            if sector:
+                entry["sectors"].append({
+                    "sector": sector,
+                    "is_sector_lead": cint((row.get("Is Sector Lead") or "0").strip())
+                })
+
+    return list(entries.values())
+
+
+ONBOARDING_CHUNK_SIZE = 100
+
+
+def onboard_sector_users_bg(users, user=None):
+    """
+    Create users in chunks. Each entry is inserted under its own
+    savepoint so a bad row is reported without losing the chunk; the
+    chunk's memberships and KPI rows are then written in bulk and
+    committed, and progress is published.
+    """
+    user = user or frappe.session.user
+    total = len(users)
+    valid_sectors = set(frappe.get_all("Sector", pluck="name"))
+
+    created = []
+    errors = []
+
+    for start in range(0, total, ONBOARDING_CHUNK_SIZE):
+        assignments = []
+
+        for i, entry in enumerate(users[start:start + ONBOARDING_CHUNK_SIZE], start=start):
+            row = entry.get("row") or i + 1
+            sectors = entry.get("sectors") or []
+
+            unknown = [s.get("sector") for s in sectors if s.get("sector") not in valid_sectors]
+            if unknown:
+                errors.append({"row": row, "email": entry.get("email"),
+                               "error": f"Unknown sector(s): {', '.join(map(str, unknown))}"})
+                continue
+
+            frappe.db.savepoint("psn_onboard_user")
+            try:
+                new_user, role = new_sector_user(entry.get("full_name"), entry.get("email"), sectors)
+            except Exception as e:
+                frappe.db.rollback(save_point="psn_onboard_user")
+                frappe.clear_messages()
+                errors.append({"row": row, "email": entry.get("email"), "error": str(e)})
+                continue
+
+            created.append({"user": new_user, "role": role})
+            assignments.extend(
+                {"user": new_user, "sector": s.get("sector"), "is_sector_lead": s.get("is_sector_lead")}
+                for s in sectors
+            )
+
+        add_sector_memberships(assignments)
+        frappe.db.commit()
+
+        frappe.publish_realtime("sector_user_onboarding", {
+            "status": "In Progress",
+            "processed": min(start + ONBOARDING_CHUNK_SIZE, total),
+            "total": total,
+            "created": len(created),
+            "errors": len(errors)
+        }, user=user)
+
+    summary = {
+        "status": "Completed",
+        "total": total,
+        "created": created,
+        "errors": errors
     }
+    frappe.publish_realtime("sector_user_onboarding", summary, user=user)
+
+    return summary
 
 
 @frappe.whitelist()
@@ -403,24 +719,7 @@ def get_task_activity(task_name):
 
 @frappe.whitelist()
 def sync_user_kpi():
-    sectors = frappe.get_all("Sector", fields=["name"])
-
-    for sec in sectors:
-        sec_doc = frappe.get_doc("Sector", sec.name)
-
-        for member in sec_doc.members:
-            exists = frappe.db.exists(
-                "User Sector KPI",
-                {"user": member.user, "sector": sec.name}
-            )
-
-            if not exists:
-                kpi = frappe.new_doc("User Sector KPI")
-                kpi.user = member.user
-                kpi.sector = sec.name
-                kpi.custom_is_sector_lead = member.is_sector_lead
-                kpi.insert(ignore_permissions=True)
-
+    sync_kpi_memberships()
     frappe.db.commit()
     return "OK"
 
@@ -428,6 +727,9 @@ def sync_user_kpi():
 def create_default_event_tasks_bg(event_id):
     """
     Background job to create default tasks for an event
+
+    Tasks are inserted in bulk without per-document hooks,
+    so the event counters are recounted once at the end.
     """
     if not frappe.db.exists("Event Readiness", event_id):
         frappe.log_error(f"Event {event_id} not found", "BG Task")
@@ -442,37 +744,79 @@ def create_default_event_tasks_bg(event_id):
         fields=["sector", "task_name", "description", "duration_days"]
     )
 
-    for tmpl in templates:
-        if frappe.db.exists(
+    # -------------------------
+    # 1️⃣ Existing (sector, task) pairs for this event
+    # -------------------------
+    existing = {
+        (t.sector, t.l2_task_name)
+        for t in frappe.get_all(
             "Event Task",
-            {
-                "event": doc.name,
-                "sector": tmpl.sector,
-                "l2_task_name": tmpl.task_name
-            }
-        ):
-            continue
-
-        lead = frappe.db.get_value(
-            "Sector Member",
-            {"is_sector_lead": 1, "parent": tmpl.sector},
-            "user"
+            filters={"event": doc.name},
+            fields=["sector", "l2_task_name"]
         )
+    }
+
+    # -------------------------
+    # 2️⃣ Sector leads in one query
+    # -------------------------
+    lead_map = get_sector_lead_map({t.sector for t in templates if t.sector})
+
+    # -------------------------
+    # 3️⃣ Build task rows
+    # -------------------------
+    now_ts = now()
+    user = frappe.session.user
+    base_date = doc.event_date or nowdate()
+
+    fields = [
+        "name", "creation", "modified", "owner", "modified_by", "docstatus", "idx",
+        "event", "sector", "sector_lead", "l2_task_name", "task_description",
+        "status", "weightage", "progress", "due_date"
+    ]
+    values = []
+    transitions = []
+
+    for tmpl in templates:
+        key = (tmpl.sector, tmpl.task_name)
+        if key in existing:
+            continue
+        existing.add(key)
 
         task = frappe.new_doc("Event Task")
         task.event = doc.name
         task.sector = tmpl.sector
-        task.sector_lead = lead
+        task.sector_lead = lead_map.get(tmpl.sector)
         task.l2_task_name = tmpl.task_name
         task.task_description = tmpl.description
         task.status = "Pending"
         task.weightage = 0
         task.progress = 0
-
-        base_date = doc.event_date or nowdate()
         task.due_date = add_days(base_date, tmpl.duration_days or 0)
+        task.set_new_name()
+
+        values.append((
+            task.name, now_ts, now_ts, user, user, 0, 0,
+            task.event, task.sector, task.sector_lead, task.l2_task_name,
+            task.task_description, task.status, task.weightage, task.progress,
+            task.due_date
+        ))
+        transitions.append({
+            "task": task.name,
+            "event": task.event,
+            "sector": task.sector,
+            "to_status": task.status,
+            "transitioned_on": now_ts,
+        })
 
-        task.insert(ignore_permissions=True)
+    # -------------------------
+    # 4️⃣ Multi-row insert + single recount
+    # -------------------------
+    if values:
+        frappe.db.bulk_insert("Event Task", fields, values, chunk_size=500)
+        log_transitions(transitions)
+        bump_data_version("tasks")
+        refresh_sector_rollups({t["sector"] for t in transitions})
+        rebuild_event_visibility([doc.name])
 
     update_event_task_stats(doc.name)
 
@@ -485,8 +829,13 @@ def import_task_templates(csv_file):
     csv_file:
       - file_url from Attach field
       - Example: /private/files/Task Template - Task Template.csv
+
+    The import runs as a background job; progress and the final
+    summary are published on the "task_template_import" realtime event.
     """
 
+    frappe.only_for(("System Manager", "Event Readiness Admin"))
+
     # -------------------------------------------------
     # 1️⃣ Validate input
     # -------------------------------------------------
@@ -494,35 +843,112 @@ def import_task_templates(csv_file):
         frappe.throw("CSV file is required")
 
     # -------------------------------------------------
-    # 2️⃣ Resolve absolute file path (v15 SAFE)
+    # 2️⃣ Resolve through the File record (never a raw path)
+    # -------------------------------------------------
+    file_doc = frappe.get_doc("File", {"file_url": csv_file})
+    file_doc.check_permission("read")
+
+    # -------------------------------------------------
+    # 3️⃣ Hand over to the background job
     # -------------------------------------------------
-    # csv_file already contains /private/files/...
-    site_path = frappe.get_site_path()
-    relative_path = csv_file.lstrip("/")
-    file_path = os.path.join(site_path, relative_path)
+    job = frappe.enqueue(
+        "psn_custom_rdb_app.psn_readiness_dashboard.event_logic.import_task_templates_bg",
+        queue="long",
+        timeout=3600,
+        file_name=file_doc.name,
+        user=frappe.session.user
+    )
+
+    return {
+        "message": "Task Template import started",
+        "job_id": job.id if job else None
+    }
 
-    if not os.path.exists(file_path):
-        frappe.throw(f"File not found on disk: {file_path}")
+
+TEMPLATE_IMPORT_CHUNK_SIZE = 500
+TEMPLATE_FIELDS = [
+    "name", "creation", "modified", "owner", "modified_by", "docstatus", "idx",
+    "template_name", "sector", "l1_indicator", "task_name", "description", "duration_days"
+]
+
+
+def import_task_templates_bg(file_name, user=None):
+    """
+    Stream the CSV and insert Task Templates in chunks.
+
+    Sectors and existing templates are loaded once; each chunk is
+    bulk-inserted and committed, then progress is published.
+    """
+    user = user or frappe.session.user
+
+    content = frappe.get_doc("File", file_name).get_content()
+    if isinstance(content, bytes):
+        content = content.decode("utf-8-sig")
+    content = content.lstrip("\ufeff")
+
+    # count CSV records, not physical lines (quoted cells may span lines)
+    with io.StringIO(content, newline="") as f:
+        total_rows = max(sum(1 for row in csv.reader(f) if row) - 1, 0)
 
     # -------------------------------------------------
-    # 3️⃣ Read CSV file
+    # 1️⃣ Sectors by name and by label (one query)
+    # -------------------------------------------------
+    sector_map = {}
+    for sec in frappe.get_all("Sector", fields=["name", "sector_name"]):
+        sector_map[sec.name] = sec.name
+        if sec.sector_name:
+            sector_map.setdefault(sec.sector_name, sec.name)
+
+    # -------------------------------------------------
+    # 2️⃣ Existing templates (one query)
+    # -------------------------------------------------
+    existing_keys = set()
+    existing_names = set()
+    for t in frappe.get_all(
+        "Task Template",
+        fields=["name", "template_name", "sector", "l1_indicator", "task_name", "duration_days"]
+    ):
+        existing_names.add(t.name)
+        existing_keys.add((
+            t.template_name, t.sector, t.l1_indicator or "", t.task_name or "", cint(t.duration_days)
+        ))
+
+    # -------------------------------------------------
+    # 3️⃣ Stream rows
     # -------------------------------------------------
     created = 0
     skipped = 0
+    processed = 0
     errors = []
-
-    with open(file_path, "r", encoding="utf-8-sig") as f:
+    chunk = []
+    now_ts = now()
+
+    def flush_chunk():
+        nonlocal created
+        if chunk:
+            frappe.db.bulk_insert("Task Template", TEMPLATE_FIELDS, chunk)
+            created += len(chunk)
+            chunk.clear()
+        frappe.db.commit()
+        frappe.publish_realtime("task_template_import", {
+            "status": "In Progress",
+            "processed": processed,
+            "total": total_rows,
+            "created": created,
+            "skipped": skipped,
+            "errors": len(errors)
+        }, user=user)
+
+    with io.StringIO(content, newline="") as f:
         reader = csv.DictReader(f)
 
-        # -------------------------------------------------
-        # 4️⃣ Process rows
-        # -------------------------------------------------
         for row_no, row in enumerate(reader, start=2):
+            processed += 1
             try:
                 # ---- CSV fields (AS PER YOUR SYSTEM)
                 template_name = (row.get("Template Name") or "").strip()
                 sector_label = (row.get("Sector") or "").strip()
-                duration_days = row.get("Duration Days")
+                duration_days = int(row.get("Duration Days") or 0)
                 task_name = (row.get("L2 Indicators") or "").strip()
                 l1_indicator = (row.get("L1 Indicator") or "").strip()
                 description = (row.get("Description") or "").strip()
@@ -530,51 +956,35 @@ def import_task_templates(csv_file):
                 if not sector_label or not task_name:
                     raise Exception("Missing Sector or L2 Task Name")
 
-                # -------------------------------------------------
-                # Ensure Sector exists
-                # -------------------------------------------------
-                sector = frappe.db.get_value(
-                    "Sector",
-                    {"sector_name": sector_label},
-                    "name"
-                )
+                if not template_name:
+                    raise Exception("Missing Template Name")
 
+                # ---- Ensure Sector exists
+                sector = sector_map.get(sector_label)
                 if not sector:
                     sector_doc = frappe.get_doc({
                         "doctype": "Sector",
                         "sector_name": sector_label
                     })
                     sector_doc.insert(ignore_permissions=True)
-                    sector = sector_doc.name
+                    sector = sector_map[sector_label] = sector_doc.name
 
-                # -------------------------------------------------
-                # Avoid duplicate Task Templates
-                # -------------------------------------------------
-                if frappe.db.exists("Task Template", {
-                    "template_name": template_name,
-                    "sector": sector,
-                    "l1_indicator": l1_indicator,
-                    "task_name": task_name,
-                    "duration_days": int(duration_days or 0)
-                }):
+                # ---- Avoid duplicate Task Templates
+                key = (template_name, sector, l1_indicator, task_name, duration_days)
+                if key in existing_keys:
                     skipped += 1
                     continue
 
-                # -------------------------------------------------
-                # Create Task Template
-                # -------------------------------------------------
-                task = frappe.get_doc({
-                    "doctype": "Task Template",
-                    "template_name": template_name,
-                    "sector": sector,
-                    "l1_indicator": l1_indicator,
-                    "task_name": task_name,
-                    "description": description,
-                    "duration_days": int(duration_days or 0)
-                })
+                if template_name in existing_names:
+                    raise Exception(f"Template Name {template_name} already exists")
 
-                task.insert(ignore_permissions=True)
-                created += 1
+                existing_keys.add(key)
+                existing_names.add(template_name)
+
+                chunk.append((
+                    template_name, now_ts, now_ts, user, user, 0, 0,
+                    template_name, sector, l1_indicator, task_name, description, duration_days
+                ))
 
             except Exception as e:
                 errors.append({
@@ -583,54 +993,39 @@ def import_task_templates(csv_file):
                     "data": row
                 })
 
+            if len(chunk) >= TEMPLATE_IMPORT_CHUNK_SIZE:
+                flush_chunk()
+
+    flush_chunk()
+
     # -------------------------------------------------
-    # 5️⃣ Return summary
+    # 4️⃣ Publish summary
     # -------------------------------------------------
-    return {
+    summary = {
+        "status": "Completed",
+        "processed": processed,
+        "total": total_rows,
         "created": created,
         "skipped": skipped,
         "errors": errors
     }
+    frappe.publish_realtime("task_template_import", summary, user=user)
+
+    return summary
 
 
 @frappe.whitelist()
 def recalculate_sector_readiness(sector):
+    """
+    Repair path: counters are kept current by task deltas and the daily
+    refresh_all_sector_rollups. Rebuilds one sector on demand.
+    """
+    frappe.only_for(("System Manager", "Event Readiness Admin"))
+
     if not sector:
         frappe.throw("Sector is required")
 
-    stats = frappe.db.sql("""
-        SELECT
-            COUNT(*) AS total_tasks,
-            SUM(CASE WHEN status = 'Completed' THEN 1 ELSE 0 END) AS completed_tasks,
-            SUM(CASE WHEN status = 'In Progress' THEN 1 ELSE 0 END) AS in_progress_tasks
-        FROM `tabEvent Task`
-        WHERE sector = %s
-    """, sector, as_dict=True)[0]
-
-    total_tasks = stats.total_tasks or 0
-    completed_tasks = stats.completed_tasks or 0
-    in_progress_tasks = stats.in_progress_tasks or 0
-
-    sector_readiness = (
-        flt((completed_tasks / total_tasks) * 100, 2)
-        if total_tasks > 0 else 0
-    )
-
-    sector_doc = frappe.get_doc("Sector", sector)
-
-    sector_doc.total_tasks = total_tasks
-    sector_doc.completed_tasks = completed_tasks
-    sector_doc.in_progress_tasks = in_progress_tasks
-    sector_doc.sector_readiness = sector_readiness
-
-    sector_doc.save(ignore_permissions=True)
-
-    return {
-        "total_tasks": total_tasks,
-        "completed_tasks": completed_tasks,
-        "in_progress_tasks": in_progress_tasks,
-        "sector_readiness": sector_readiness
-    }
+    return refresh_sector_rollups([sector]).get(sector)
 
 
 @frappe.whitelist()
@@ -642,7 +1037,7 @@ def get_sector_detail(sector):
     members = []
     user_ids = []
 
-    for row in sector_doc.sector_members:
+    for row in sector_doc.members:
         user_ids.append(row.user)
 
     user_map = {
@@ -655,21 +1050,21 @@ def get_sector_detail(sector):
     }
     task_stats = frappe.db.sql("""
         SELECT
-            assigned_to,
+            incharge,
             COUNT(*) AS total_tasks,
             SUM(CASE WHEN status = 'Completed' THEN 1 ELSE 0 END) AS completed_tasks
         FROM `tabEvent Task`
         WHERE sector = %s
-        GROUP BY assigned_to
+        GROUP BY incharge
     """, sector, as_dict=True)
 
     task_map = {
-        t.assigned_to: t
+        t.incharge: t
         for t in task_stats
     }
-    for row in sector_doc.sector_members:
+    for row in sector_doc.members:
         user = user_map.get(row.user)
-        stats = task_map.get(row.user, {})
+        stats = task_map.get(row.user) or frappe._dict()
 
         total = stats.total_tasks or 0
         completed = stats.completed_tasks or 0
@@ -688,7 +1083,7 @@ def get_sector_detail(sector):
             "sectors": [{
                 "sectorId": sector_doc.name,
                 "sectorName": sector_doc.name,
-                "isLead": row.is_lead
+                "isLead": row.is_sector_lead
             }],
             "tasksAssigned": total,
             "tasksCompleted": completed,
@@ -714,17 +1109,10 @@ def add_sector_member(sector, user, is_lead=0):
     if not sector or not user:
         frappe.throw("Sector and User are required")
 
-    sector_doc = frappe.get_doc("Sector", sector)
-
     # Prevent duplicates
-    if any(row.user == user for row in sector_doc.sector_members):
+    if frappe.db.exists("Sector Member", {"parenttype": "Sector", "parent": sector, "user": user}):
         frappe.throw("User already added to this sector")
 
-    sector_doc.append("sector_members", {
-        "user": user,
-        "is_lead": is_lead
-    })
-
-    sector_doc.save(ignore_permissions=True)
+    add_sector_memberships([{"user": user, "sector": sector, "is_sector_lead": is_lead}])
 
     return {"status": "success"}
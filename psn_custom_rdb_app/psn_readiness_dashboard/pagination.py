@@ -0,0 +1,141 @@
+import base64
+import hashlib
+import json
+
+import frappe
+from frappe.utils import cint
+
+MAX_PAGE_SIZE = 500
+TASK_COUNT_CACHE_TTL = 60
+
+# Event Task columns the per-event task lists may project
+EVENT_TASK_FIELDS = [
+    "name", "l2_task_name", "sector", "status",
+    "incharge", "creation", "due_date", "progress"
+]
+
+
+def parse_fields(fields, allowed_fields, required=("name",)):
+    """
+    Project the requested fields onto the endpoint's allowed list.
+    Required fields (sort keys) are always included.
+    """
+    if isinstance(fields, str):
+        fields = json.loads(fields or "[]")
+
+    selected = [f for f in (fields or allowed_fields) if f in allowed_fields]
+
+    for f in reversed(required):
+        if f not in selected:
+            selected.insert(0, f)
+
+    return selected
+
+
+def encode_cursor(value, name):
+    raw = json.dumps([str(value) if value is not None else None, name])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        value, name = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except Exception:
+        frappe.throw("Invalid cursor")
+    return value, name
+
+
+def _build_conditions(filters, values):
+    conditions = []
+
+    for i, (field, condition) in enumerate((filters or {}).items()):
+        key = f"f{i}"
+        if isinstance(condition, (list, tuple)):
+            operator, value = condition
+            if operator != "in":
+                frappe.throw(f"Unsupported filter operator: {operator}")
+            if not value:
+                conditions.append("1=0")
+                continue
+            conditions.append(f"`{field}` IN %({key})s")
+        else:
+            value = condition
+            conditions.append(f"`{field}` = %({key})s")
+        values[key] = value
+
+    return conditions
+
+
+def get_task_page(filters, order_field, fields, page_size, cursor=None):
+    """
+    Keyset pagination over Event Task on (order_field, name), ascending.
+
+    Returns the page of tasks, the cursor for the next page and the total
+    row count (computed on the first page, then served from cache).
+    """
+    page_size = min(max(cint(page_size), 1), MAX_PAGE_SIZE)
+    values = {}
+    conditions = _build_conditions(filters, values)
+    base_conditions = list(conditions)
+
+    # MariaDB sorts NULLs first on ASC
+    if cursor:
+        cursor_value, cursor_name = decode_cursor(cursor)
+        values["cursor_value"] = cursor_value
+        values["cursor_name"] = cursor_name
+
+        if cursor_value is None:
+            conditions.append(
+                f"((`{order_field}` IS NULL AND name > %(cursor_name)s) OR `{order_field}` IS NOT NULL)"
+            )
+        else:
+            conditions.append(
+                f"(`{order_field}` > %(cursor_value)s"
+                f" OR (`{order_field}` = %(cursor_value)s AND name > %(cursor_name)s))"
+            )
+
+    values["page_size"] = page_size + 1
+    columns = ", ".join(f"`{f}`" for f in fields)
+
+    rows = frappe.db.sql(f"""
+        SELECT {columns}
+        FROM `tabEvent Task`
+        WHERE {" AND ".join(conditions) or "1=1"}
+        ORDER BY `{order_field}` asc, name asc
+        LIMIT %(page_size)s
+    """, values, as_dict=True)
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.get(order_field), last.name)
+
+    return {
+        "tasks": rows,
+        "next_cursor": next_cursor,
+        "total_count": _get_task_count(base_conditions, values, refresh=not cursor),
+    }
+
+
+def _get_task_count(conditions, values, refresh=False):
+    where = " AND ".join(conditions) or "1=1"
+    count_values = {k: v for k, v in values.items() if k.startswith("f")}
+
+    key = "psn_task_count::" + hashlib.md5(
+        frappe.as_json([where, count_values]).encode()
+    ).hexdigest()
+
+    if not refresh:
+        cached = frappe.cache().get_value(key)
+        if cached is not None:
+            return cached
+
+    total = frappe.db.sql(
+        f"SELECT COUNT(*) FROM `tabEvent Task` WHERE {where}",
+        count_values
+    )[0][0]
+
+    frappe.cache().set_value(key, total, expires_in_sec=TASK_COUNT_CACHE_TTL)
+
+    return total
@@ -1,37 +1,33 @@
 import frappe
 
+from psn_custom_rdb_app.psn_readiness_dashboard.access_scope import get_access_scope
+
 frappe.flags.ignore_csrf = True
 
 
 @frappe.whitelist()
 def filter_tasks(query_filters=None):
     user = frappe.session.user
-    roles = frappe.get_roles(user)
+    scope = get_access_scope(user)
 
     base_filter = query_filters.copy() if query_filters else {}
 
     # ------------------------------------------------
     # 1️⃣ Admin → no restriction
     # ------------------------------------------------
-    if user == "Administrator" or "Event Readiness Admin" in roles:
+    if scope.is_admin:
         return base_filter
 
     # ------------------------------------------------
-    # 2️⃣ Load user sector mappings
+    # 2️⃣ User sector mappings (cached access scope)
     # ------------------------------------------------
-    kpi_entries = frappe.get_all(
-        "User Sector KPI",
-        filters={"user": user},
-        fields=["sector", "custom_is_sector_lead"]
-    )
-
-    if not kpi_entries:
+    if not scope.sectors:
         # user has no access to any task
         base_filter["name"] = "__invalid__"
         return base_filter
 
-    user_sectors = [k.sector for k in kpi_entries]
-    is_sector_lead = any(k.custom_is_sector_lead for k in kpi_entries)
+    user_sectors = scope.sectors
+    is_sector_lead = scope.is_lead
 
     # ------------------------------------------------
     # 3️⃣ Sector Lead → sector-based filter
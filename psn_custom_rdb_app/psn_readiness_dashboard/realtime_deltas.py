@@ -0,0 +1,187 @@
+import frappe
+
+REALTIME_EVENT = "psn_readiness_delta"
+ADMIN_ROLE = "Event Readiness Admin"
+
+
+def queue_realtime_delta(delta, events=(), sectors=(), lead_sectors=(), users=()):
+    """
+    Queue a small delta message for admins plus:
+      - events: users who can see any of the events (Event Visibility)
+      - sectors: members of any of the sectors (User Sector KPI)
+      - lead_sectors: only sector leads of any of the sectors
+      - users: these users (with lead_sectors: only if they are members
+        of one of those sectors)
+
+    Task-level messages use lead_sectors / users so they reach the same
+    people get_task_filters would show the task to.
+
+    Messages are grouped per user and published once the current
+    transaction commits; a rollback drops them.
+    """
+    pending = getattr(frappe.local, "psn_realtime_deltas", None)
+
+    if pending is None:
+        pending = frappe.local.psn_realtime_deltas = []
+        frappe.db.after_commit.add(publish_realtime_deltas)
+        frappe.db.after_rollback.add(discard_realtime_deltas)
+
+    pending.append(frappe._dict(
+        events={e for e in events if e},
+        sectors={s for s in sectors if s},
+        lead_sectors={s for s in lead_sectors if s},
+        users={u for u in users if u},
+        delta=delta
+    ))
+
+
+def publish_realtime_deltas():
+    pending = getattr(frappe.local, "psn_realtime_deltas", None) or []
+    frappe.local.psn_realtime_deltas = None
+
+    if not pending:
+        return
+
+    event_viewers = _get_event_viewers(set().union(*(p.events for p in pending)))
+    sector_viewers = _get_sector_viewers(set().union(*(p.sectors | p.lead_sectors for p in pending)))
+    sector_leads = _get_sector_leads(set().union(*(p.lead_sectors for p in pending)))
+    admins = _get_admins()
+
+    messages = {}
+    for p in pending:
+        recipients = set(admins)
+        if p.lead_sectors:
+            members = set().union(*(sector_viewers.get(s, set()) for s in p.lead_sectors))
+            recipients.update(p.users & members)
+        else:
+            recipients.update(p.users)
+        for event in p.events:
+            recipients.update(event_viewers.get(event, ()))
+        for sector in p.sectors:
+            recipients.update(sector_viewers.get(sector, ()))
+        for sector in p.lead_sectors:
+            recipients.update(sector_leads.get(sector, ()))
+
+        for user in recipients:
+            messages.setdefault(user, []).append(p.delta)
+
+    for user, deltas in messages.items():
+        frappe.publish_realtime(REALTIME_EVENT, {"deltas": deltas}, user=user)
+
+
+def discard_realtime_deltas():
+    frappe.local.psn_realtime_deltas = None
+
+
+def _get_event_viewers(events):
+    viewers = {}
+    if not events:
+        return viewers
+
+    for user, event in frappe.db.sql("""
+        SELECT user, event
+        FROM `tabEvent Visibility`
+        WHERE event IN %(events)s
+    """, {"events": list(events)}):
+        viewers.setdefault(event, set()).add(user)
+
+    return viewers
+
+
+def _get_sector_viewers(sectors):
+    viewers = {}
+    if not sectors:
+        return viewers
+
+    for user, sector in frappe.db.sql("""
+        SELECT user, sector
+        FROM `tabUser Sector KPI`
+        WHERE sector IN %(sectors)s
+    """, {"sectors": list(sectors)}):
+        viewers.setdefault(sector, set()).add(user)
+
+    return viewers
+
+
+def _get_sector_leads(sectors):
+    """Leads with a KPI row in the sector (a lead sees all of their sectors' tasks)."""
+    leads = {}
+    if not sectors:
+        return leads
+
+    for user, sector in frappe.db.sql("""
+        SELECT k.user, k.sector
+        FROM `tabUser Sector KPI` k
+        WHERE k.sector IN %(sectors)s
+            AND EXISTS (
+                SELECT 1 FROM `tabUser Sector KPI` l
+                WHERE l.user = k.user AND l.custom_is_sector_lead = 1
+            )
+    """, {"sectors": list(sectors)}):
+        leads.setdefault(sector, set()).add(user)
+
+    return leads
+
+
+def _get_admins():
+    admins = frappe.get_all(
+        "Has Role",
+        filters={"role": ADMIN_ROLE, "parenttype": "User"},
+        pluck="parent"
+    )
+    return {"Administrator", *admins}
+
+
+# -------------------------
+# doc_events
+# -------------------------
+TASK_DELTA_FIELDS = ("event", "sector", "status", "incharge")
+
+
+def on_event_task_change(doc, method=None):
+    if method == "on_trash":
+        queue_realtime_delta({
+            "type": "task_removed",
+            "task": doc.name,
+            "event": doc.event,
+            "sector": doc.sector,
+        }, lead_sectors=[doc.sector], users=[doc.incharge])
+        return
+
+    previous = doc.get_doc_before_save()
+    changed = [
+        f for f in TASK_DELTA_FIELDS
+        if not previous or previous.get(f) != doc.get(f)
+    ]
+    if not changed:
+        return
+
+    queue_task_delta(doc, previous, changed)
+
+
+def queue_task_delta(task, previous=None, changed=TASK_DELTA_FIELDS):
+    """
+    Publish the changed fields of one task (new values plus old ones)
+    to admins, leads of its sector and its incharge only.
+    """
+    delta = {
+        "type": "task" if previous else "task_added",
+        "task": task.name,
+        "event": task.event,
+        "sector": task.sector,
+        "changes": {
+            f: {"from": previous.get(f) if previous else None, "to": task.get(f)}
+            for f in changed
+        },
+    }
+
+    sectors = [task.sector]
+    users = [task.incharge]
+
+    # moved / reassigned tasks are also announced to the old sector's
+    # leads and the old incharge
+    if previous:
+        sectors.append(previous.get("sector"))
+        users.append(previous.get("incharge"))
+
+    queue_realtime_delta(delta, lead_sectors=sectors, users=users)
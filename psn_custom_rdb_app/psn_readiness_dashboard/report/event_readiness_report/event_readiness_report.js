@@ -0,0 +1,42 @@
+// Copyright (c) 2026, PSN and contributors
+// For license information, please see license.txt
+
+frappe.query_reports["Event Readiness Report"] = {
+    filters: [
+        {
+            fieldname: "from_date",
+            label: __("From Date"),
+            fieldtype: "Date"
+        },
+        {
+            fieldname: "to_date",
+            label: __("To Date"),
+            fieldtype: "Date"
+        },
+        {
+            fieldname: "sector",
+            label: __("Sector"),
+            fieldtype: "Link",
+            options: "Sector"
+        },
+        {
+            fieldname: "drill_down",
+            label: __("Drill Down"),
+            fieldtype: "Select",
+            options: ["Event", "Sector", "Task"],
+            default: "Event"
+        },
+        {
+            fieldname: "page_length",
+            label: __("Rows Per Page"),
+            fieldtype: "Int",
+            default: 500
+        },
+        {
+            fieldname: "page",
+            label: __("Page"),
+            fieldtype: "Int",
+            default: 1
+        }
+    ]
+};
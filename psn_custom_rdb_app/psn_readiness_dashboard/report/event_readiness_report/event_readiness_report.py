@@ -1,27 +1,210 @@
 import frappe
+from frappe import _
+from frappe.utils import cint
+
+from psn_custom_rdb_app.psn_readiness_dashboard.access_scope import (
+    get_access_scope,
+    get_task_conditions,
+    is_event_admin,
+)
+from psn_custom_rdb_app.psn_readiness_dashboard.dashboard_api.react_events_readiness import (
+    get_event_filter_conditions,
+)
+
+DRILL_DOWN_OPTIONS = ("Event", "Sector", "Task")
+DEFAULT_PAGE_LENGTH = 500
 
 
 def execute(filters=None):
-    data = frappe.db.sql("""
+    """
+    Event readiness report (prepared-report capable).
+
+    filters:
+      - from_date / to_date → events overlapping the window
+      - sector              → only that sector's counts / tasks
+      - drill_down          → Event (default) / Sector / Task rows
+      - page, page_length   → pagination (page_length 0 = all rows)
+    """
+    filters = frappe._dict(filters or {})
+    drill_down = filters.drill_down if filters.drill_down in DRILL_DOWN_OPTIONS else "Event"
+
+    values = {}
+    conditions = get_event_filter_conditions(
+        {"from_date": filters.from_date, "to_date": filters.to_date}, values
+    )
+
+    page_length = cint(filters.page_length) if filters.page_length is not None else DEFAULT_PAGE_LENGTH
+    limit_clause = ""
+    if page_length > 0:
+        limit_clause = "LIMIT %(page_length)s OFFSET %(offset)s"
+        values["page_length"] = page_length
+        values["offset"] = (max(cint(filters.page), 1) - 1) * page_length
+
+    if drill_down == "Task":
+        return get_task_columns(), get_task_rows(filters, conditions, values, limit_clause)
+
+    if drill_down == "Sector" or filters.sector:
+        return get_sector_columns(), get_sector_rows(filters, conditions, values, limit_clause)
+
+    return get_event_columns(), get_event_rows(conditions, values, limit_clause)
+
+
+# -------------------------
+# Event rows (precomputed Event Readiness counters)
+# -------------------------
+def get_event_rows(conditions, values, limit_clause):
+    user = frappe.session.user
+
+    if not is_event_admin(user):
+        conditions.append("""EXISTS (
+            SELECT 1 FROM `tabEvent Visibility` v
+            WHERE v.user = %(user)s AND v.event = e.name
+        )""")
+        values["user"] = user
+
+    return frappe.db.sql(f"""
+        SELECT
+            e.name AS event,
+            e.event_name,
+            e.event_date,
+            e.custom_event_end_date,
+            e.total_tasks,
+            e.pending_tasks,
+            e.custom_in_progress_tasks AS in_progress_tasks,
+            e.completed_tasks,
+            e.delayed_tasks,
+            e.event_readiness
+        FROM `tabEvent Readiness` e
+        WHERE {" AND ".join(conditions) or "1=1"}
+        ORDER BY e.event_date DESC, e.name
+        {limit_clause}
+    """, values, as_dict=True)
+
+
+# -------------------------
+# Sector drill-down (precomputed Event Sector rows)
+# -------------------------
+def get_sector_rows(filters, conditions, values, limit_clause):
+    scope = get_access_scope()
+
+    if filters.sector:
+        conditions.append("es.sector = %(sector)s")
+        values["sector"] = filters.sector
+
+    if not is_event_admin(scope=scope):
+        if not scope.sectors:
+            return []
+        conditions.append("es.sector IN %(sectors)s")
+        values["sectors"] = scope.sectors
+
+    return frappe.db.sql(f"""
         SELECT
-            name as event_name,
-            event_readiness,
-            start_date,
-            end_date
-        FROM `tabEvent Readiness`
-        WHERE docstatus < 2
-        ORDER BY start_date DESC
-    """, as_dict=True)
-
-    columns = [
-        {"label": "Event", "fieldname": "event_name", "fieldtype": "Link",
-            "options": "Event Readiness", "width": 200},
-        {"label": "Readiness (%)", "fieldname": "event_readiness",
-         "fieldtype": "Percent", "width": 130},
-        {"label": "Start Date", "fieldname": "start_date",
-            "fieldtype": "Date", "width": 130},
-        {"label": "End Date", "fieldname": "end_date",
-            "fieldtype": "Date", "width": 130},
+            e.name AS event,
+            e.event_name,
+            e.event_date,
+            e.custom_event_end_date,
+            es.sector,
+            es.total_tasks,
+            es.pending_tasks,
+            es.in_progress_tasks,
+            es.completed_tasks,
+            es.delayed_tasks,
+            es.readiness AS event_readiness
+        FROM `tabEvent Sector` es
+        INNER JOIN `tabEvent Readiness` e ON e.name = es.event
+        WHERE {" AND ".join(conditions) or "1=1"}
+        ORDER BY e.event_date DESC, e.name, es.sector
+        {limit_clause}
+    """, values, as_dict=True)
+
+
+# -------------------------
+# Task drill-down
+# -------------------------
+def get_task_rows(filters, conditions, values, limit_clause):
+    conditions.append(get_task_conditions(alias="t"))
+
+    if filters.sector:
+        conditions.append("t.sector = %(sector)s")
+        values["sector"] = filters.sector
+
+    return frappe.db.sql(f"""
+        SELECT
+            e.name AS event,
+            e.event_name,
+            e.event_date,
+            t.sector,
+            t.name AS task,
+            t.l2_task_name,
+            t.incharge,
+            t.status,
+            t.due_date,
+            t.progress
+        FROM `tabEvent Task` t
+        INNER JOIN `tabEvent Readiness` e ON e.name = t.event
+        WHERE {" AND ".join(conditions)}
+        ORDER BY e.event_date DESC, e.name, t.sector, t.due_date, t.name
+        {limit_clause}
+    """, values, as_dict=True)
+
+
+# -------------------------
+# Columns
+# -------------------------
+def _event_columns():
+    return [
+        {"label": _("Event"), "fieldname": "event", "fieldtype": "Link",
+            "options": "Event Readiness", "width": 160},
+        {"label": _("Event Name"), "fieldname": "event_name",
+            "fieldtype": "Data", "width": 200},
+        {"label": _("Event Date"), "fieldname": "event_date",
+            "fieldtype": "Date", "width": 110},
+    ]
+
+
+def _count_columns():
+    return [
+        {"label": _("Total"), "fieldname": "total_tasks", "fieldtype": "Int", "width": 90},
+        {"label": _("Pending"), "fieldname": "pending_tasks", "fieldtype": "Int", "width": 90},
+        {"label": _("In Progress"), "fieldname": "in_progress_tasks", "fieldtype": "Int", "width": 100},
+        {"label": _("Completed"), "fieldname": "completed_tasks", "fieldtype": "Int", "width": 100},
+        {"label": _("Delayed"), "fieldname": "delayed_tasks", "fieldtype": "Int", "width": 90},
+        {"label": _("Readiness (%)"), "fieldname": "event_readiness",
+            "fieldtype": "Percent", "width": 130},
     ]
 
-    return columns, data
+
+def get_event_columns():
+    return [
+        *_event_columns(),
+        {"label": _("End Date"), "fieldname": "custom_event_end_date",
+            "fieldtype": "Date", "width": 110},
+        *_count_columns(),
+    ]
+
+
+def get_sector_columns():
+    return [
+        *_event_columns(),
+        {"label": _("End Date"), "fieldname": "custom_event_end_date",
+            "fieldtype": "Date", "width": 110},
+        {"label": _("Sector"), "fieldname": "sector", "fieldtype": "Link",
+            "options": "Sector", "width": 150},
+        *_count_columns(),
+    ]
+
+
+def get_task_columns():
+    return [
+        *_event_columns(),
+        {"label": _("Sector"), "fieldname": "sector", "fieldtype": "Link",
+            "options": "Sector", "width": 150},
+        {"label": _("Task"), "fieldname": "task", "fieldtype": "Link",
+            "options": "Event Task", "width": 120},
+        {"label": _("Task Name"), "fieldname": "l2_task_name", "fieldtype": "Data", "width": 220},
+        {"label": _("Incharge"), "fieldname": "incharge", "fieldtype": "Link",
+            "options": "User", "width": 160},
+        {"label": _("Status"), "fieldname": "status", "fieldtype": "Data", "width": 100},
+        {"label": _("Due Date"), "fieldname": "due_date", "fieldtype": "Date", "width": 110},
+        {"label": _("Progress"), "fieldname": "progress", "fieldtype": "Percent", "width": 100},
+    ]
@@ -0,0 +1,125 @@
+import hashlib
+
+import frappe
+
+from psn_custom_rdb_app.psn_readiness_dashboard.access_scope import get_access_scope
+
+# Redis hash of data scope → version counter
+DATA_VERSIONS_KEY = "psn_data_versions"
+RESPONSE_CACHE_TTL = 600
+
+# doctype → data scope bumped when its records change
+DOCTYPE_SCOPES = {
+    "Event Task": "tasks",
+    "Event Readiness": "events",
+    "Event Sector": "events",
+    "Sector": "sectors",
+    "User Sector KPI": "kpis",
+}
+
+
+# -------------------------
+# Data versions
+# -------------------------
+def bump_data_version(*scopes):
+    """
+    Bump the given data scopes once the current transaction commits,
+    so a poll can never cache pre-commit data under the new version.
+    """
+    pending = getattr(frappe.local, "psn_pending_versions", None)
+
+    if pending is None:
+        pending = frappe.local.psn_pending_versions = set()
+        frappe.db.after_commit.add(_flush_data_versions)
+        frappe.db.after_rollback.add(_discard_data_versions)
+
+    pending.update(scopes)
+
+
+def _flush_data_versions():
+    pending = getattr(frappe.local, "psn_pending_versions", None) or set()
+    frappe.local.psn_pending_versions = None
+
+    cache = frappe.cache()
+    key = cache.make_key(DATA_VERSIONS_KEY)
+    for scope in pending:
+        cache.hincrby(key, scope, 1)
+
+
+def _discard_data_versions():
+    frappe.local.psn_pending_versions = None
+
+
+def get_data_versions(scopes):
+    cache = frappe.cache()
+    versions = cache.hmget(cache.make_key(DATA_VERSIONS_KEY), list(scopes))
+    return [int(v or 0) for v in versions]
+
+
+def on_data_change(doc, method=None):
+    """doc_events hook for every doctype in DOCTYPE_SCOPES."""
+    bump_data_version(DOCTYPE_SCOPES[doc.doctype])
+
+
+def get_user_scope(user):
+    """Per-user data scope: bumped when the User record (name, roles) changes."""
+    return f"user::{user}"
+
+
+def on_user_change(doc, method=None):
+    """User on_update: only that user's cached responses go stale."""
+    bump_data_version(get_user_scope(doc.name))
+
+
+# -------------------------
+# Cached responses
+# -------------------------
+def cached_response(endpoint, args, scopes, fn):
+    """
+    Serve fn() from cache, keyed by (endpoint, args, user scope,
+    data versions of scopes and of the user's own record).
+
+    The key doubles as the ETag: when the client's If-None-Match
+    matches, nothing is read or built and set_etag_headers turns the
+    response into an empty 304.
+    """
+    user = frappe.session.user
+    scope = get_access_scope(user)
+
+    digest = hashlib.md5(frappe.as_json([
+        endpoint,
+        args,
+        user,
+        sorted(scope.sectors or []), sorted(scope.roles or []), scope.is_lead, scope.is_admin,
+        get_data_versions([*scopes, get_user_scope(user)]),
+    ]).encode()).hexdigest()
+
+    etag = f'W/"{digest}"'
+    frappe.local.psn_etag = etag
+
+    if frappe.request and frappe.request.headers.get("If-None-Match") == etag:
+        frappe.local.psn_not_modified = True
+        return None
+
+    cache_key = f"psn_response::{digest}"
+    payload = frappe.cache().get_value(cache_key)
+
+    if payload is None:
+        payload = fn()
+        frappe.cache().set_value(cache_key, payload, expires_in_sec=RESPONSE_CACHE_TTL)
+
+    return payload
+
+
+def set_etag_headers(response=None, request=None):
+    """after_request hook: expose the ETag and send 304 on a match."""
+    etag = getattr(frappe.local, "psn_etag", None)
+    if not etag or response is None:
+        return
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+
+    if getattr(frappe.local, "psn_not_modified", False):
+        response.status_code = 304
+        response.set_data(b"")
@@ -0,0 +1,145 @@
+# Copyright (c) 2026, PSN and Contributors
+# See license.txt
+
+import json
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import cint
+
+from psn_custom_rdb_app.psn_readiness_dashboard.doctype.event_readiness.test_event_readiness import make_event
+from psn_custom_rdb_app.psn_readiness_dashboard.doctype.event_task.test_event_task import make_task
+from psn_custom_rdb_app.psn_readiness_dashboard.doctype.sector.test_sector import make_sector
+from psn_custom_rdb_app.psn_readiness_dashboard.event_counters import (
+	COUNTER_FIELDS,
+	EVENT_SECTOR_COUNTER_FIELDS,
+	SECTOR_COUNTER_FIELDS,
+	recount_event_counters,
+	recount_event_sectors,
+	refresh_sector_rollups,
+)
+from psn_custom_rdb_app.psn_readiness_dashboard.event_logic import update_event_task_statuses
+
+
+class TestEventCounters(FrappeTestCase):
+	"""
+	Task saves queue counter deltas that are written at commit time, so
+	every step here commits and then compares the stored counters with
+	a full recount. Records are removed again in tearDown.
+	"""
+
+	def setUp(self):
+		self.event = make_event()
+		self.sector = make_sector()
+		self.other_sector = make_sector()
+		frappe.db.commit()
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+		for task in frappe.get_all("Event Task", filters={"event": self.event.name}, pluck="name"):
+			frappe.delete_doc("Event Task", task, ignore_permissions=True, force=True)
+		frappe.db.commit()
+
+		frappe.delete_doc("Event Readiness", self.event.name, ignore_permissions=True, force=True)
+		for sector in (self.sector, self.other_sector):
+			frappe.delete_doc("Sector", sector.name, ignore_permissions=True, force=True)
+		frappe.db.commit()
+
+	def assertCountersMatchRecount(self):
+		event_counters = frappe.db.get_value(
+			"Event Readiness", self.event.name, [*COUNTER_FIELDS, "event_readiness"], as_dict=True
+		)
+		event_sectors = {
+			r.sector: {f: cint(r[f]) for f in EVENT_SECTOR_COUNTER_FIELDS}
+			for r in frappe.get_all(
+				"Event Sector", filters={"event": self.event.name}, fields=["sector", *EVENT_SECTOR_COUNTER_FIELDS]
+			)
+		}
+		sectors = {
+			s: {f: cint(frappe.db.get_value("Sector", s, f)) for f in SECTOR_COUNTER_FIELDS}
+			for s in (self.sector.name, self.other_sector.name)
+		}
+
+		# the recounts write too; compare, then throw their writes away
+		expected_event = recount_event_counters(self.event.name)
+		expected_sectors = recount_event_sectors(self.event.name)
+		expected_rollups = refresh_sector_rollups(list(sectors))
+		frappe.db.rollback()
+
+		self.assertEqual({f: cint(v) for f, v in event_counters.items()}, expected_event)
+		self.assertEqual(event_sectors, expected_sectors)
+		self.assertEqual(
+			sectors,
+			{s: {f: cint(r[f]) for f in SECTOR_COUNTER_FIELDS} for s, r in expected_rollups.items()},
+		)
+
+	def test_status_change(self):
+		task = make_task(self.event.name, self.sector.name)
+		make_task(self.event.name, self.sector.name)
+		frappe.db.commit()
+		self.assertCountersMatchRecount()
+
+		task.reload()
+		task.status = "Completed"
+		task.save(ignore_permissions=True)
+		frappe.db.commit()
+		self.assertCountersMatchRecount()
+
+		event = frappe.db.get_value(
+			"Event Readiness", self.event.name, ["completed_tasks", "event_readiness"], as_dict=True
+		)
+		self.assertEqual(event.completed_tasks, 1)
+		self.assertEqual(event.event_readiness, 50)
+
+	def test_reassignment(self):
+		task = make_task(self.event.name, self.sector.name, status="In Progress")
+		make_task(self.event.name, self.other_sector.name)
+		frappe.db.commit()
+
+		task.reload()
+		task.sector = self.other_sector.name
+		task.status = "Completed"
+		task.save(ignore_permissions=True)
+		frappe.db.commit()
+		self.assertCountersMatchRecount()
+
+		# the sector the task left has no tasks → no Event Sector row
+		self.assertFalse(frappe.db.exists("Event Sector", {"event": self.event.name, "sector": self.sector.name}))
+
+	def test_delete(self):
+		task = make_task(self.event.name, self.sector.name, status="Delayed")
+		make_task(self.event.name, self.other_sector.name)
+		frappe.db.commit()
+
+		frappe.delete_doc("Event Task", task.name, ignore_permissions=True)
+		frappe.db.commit()
+		self.assertCountersMatchRecount()
+
+		self.assertEqual(frappe.db.get_value("Event Readiness", self.event.name, "total_tasks"), 1)
+		self.assertFalse(frappe.db.exists("Event Sector", {"event": self.event.name, "sector": self.sector.name}))
+
+	def test_batch_status_update(self):
+		tasks = [
+			make_task(self.event.name, self.sector.name),
+			make_task(self.event.name, self.sector.name, status="In Progress"),
+			make_task(self.event.name, self.other_sector.name),
+		]
+		frappe.db.commit()
+
+		# the same task twice: the second entry chains from the first
+		result = update_event_task_statuses(json.dumps([
+			{"task": tasks[0].name, "status": "In Progress"},
+			{"task": tasks[0].name, "status": "Completed"},
+			{"task": tasks[1].name, "status": "Completed"},
+			{"task": tasks[2].name, "status": "Delayed", "delay_reason": "Vendor late"},
+		]))
+		self.assertEqual(result["events"], [self.event.name])
+		self.assertCountersMatchRecount()
+
+		task = frappe.db.get_value(
+			"Event Task", tasks[2].name, ["status", "delay_reason", "updated_on"], as_dict=True
+		)
+		self.assertEqual((task.status, task.delay_reason), ("Delayed", "Vendor late"))
+		self.assertTrue(task.updated_on)
+		self.assertEqual(frappe.db.get_value("Event Readiness", self.event.name, "completed_tasks"), 2)